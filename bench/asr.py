@@ -0,0 +1,117 @@
+# Offline speech recognition comparison: latency, real-time factor and word error rate per backend
+# Utterances are 16 kHz mono WAVs, each with its reference transcript in a sidecar:
+#   hello.wav + hello.txt   (or hello.json {"text": "..."}, same format as bench.endpointing)
+# Backends are billy.asr's: openai needs the network + key, vosk needs the package + model
+#
+# Run from the repo root:
+#   python -m bench.asr --utterances recordings/ [--backends openai,vosk] [--runs 2]
+
+import os
+import re
+import json
+import time
+import asyncio
+import argparse
+
+from bench.endpointing import load_sessions
+from bench.turns import percentile
+
+# 📏 Word-level edit distance against the reference (punctuation and case ignored)
+def words(text):
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+def word_errors(reference, hypothesis):
+    ref, hyp = words(reference), words(hypothesis)
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        prev, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (r != h))
+    return row[-1], len(ref)
+
+def load_utterances(directory):
+    utterances = []
+    for name, pcm, meta in load_sessions(directory):
+        text = meta.get("text") or (meta["partials"][-1][1] if meta.get("partials") else None)
+        sidecar = os.path.join(directory, name[:-4] + ".txt")
+        if text is None and os.path.exists(sidecar):
+            with open(sidecar) as f:
+                text = f.read().strip()
+        if text is None:
+            print(f"⚠️ {name}: no reference transcript, skipped")
+            continue
+        utterances.append((name, pcm, text))
+    return utterances
+
+async def run_backend(name, utterances, runs, verbose):
+    from billy import asr
+    backend = asr.BACKENDS[name]()
+    t0 = time.perf_counter()
+    try:
+        backend.warm()
+    except Exception as e:
+        print(f"⚠️ {name} skipped: {e}")
+        return None
+    warm_ms = (time.perf_counter() - t0) * 1000
+    latencies, rtfs = [], []
+    errors = total = failures = 0
+    for run in range(runs):
+        for utt, pcm, reference in utterances:
+            seconds = len(pcm) / 2 / 16000
+            t0 = time.perf_counter()
+            try:
+                text = await backend.transcribe(pcm)
+            except Exception as e:
+                failures += 1
+                print(f"⚠️ {name} {utt}: {type(e).__name__}: {e}")
+                continue
+            latency = time.perf_counter() - t0
+            latencies.append(latency * 1000)
+            rtfs.append(latency / seconds if seconds else 0.0)
+            if run == 0:
+                e, n = word_errors(reference, text)
+                errors += e
+                total += n
+                if verbose:
+                    print(f"   {name:<8} {utt:<24} {latency * 1000:>7.0f} ms  {e}/{n} errors  {text!r}")
+    return {
+        "backend": name,
+        "warm_ms": warm_ms,
+        "p50_ms": percentile(latencies, 0.5),
+        "p95_ms": percentile(latencies, 0.95),
+        "rtf": sum(rtfs) / len(rtfs) if rtfs else 0.0,
+        "wer": errors / total if total else 0.0,
+        "failures": failures,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare speech recognition backends.")
+    parser.add_argument("--utterances", required=True, help="Directory of 16 kHz mono WAVs + transcripts")
+    parser.add_argument("--backends", default="openai,vosk", help="Comma-separated billy.asr backends")
+    parser.add_argument("--runs", type=int, default=1, help="Passes over the set (latency only after the first)")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    parser.add_argument("--json", help="Write the results here")
+    args = parser.parse_args()
+
+    utterances = load_utterances(args.utterances)
+    if not utterances:
+        raise SystemExit("No utterances with reference transcripts found.")
+    seconds = sum(len(pcm) for _, pcm, _ in utterances) / 2 / 16000
+    print(f"🗣 {len(utterances)} utterances, {seconds:.1f} s of audio")
+
+    results = []
+    for name in (n.strip() for n in args.backends.split(",")):
+        result = asyncio.run(run_backend(name, utterances, args.runs, args.verbose))
+        if result is not None:
+            results.append(result)
+
+    print(f"\n{'backend':<10}{'load ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'RTF':>7}{'WER':>8}{'failed':>8}")
+    for r in results:
+        print(f"{r['backend']:<10}{r['warm_ms']:>9.0f}{r['p50_ms']:>9.0f}{r['p95_ms']:>9.0f}"
+              f"{r['rtf']:>7.2f}{r['wer'] * 100:>7.1f}%{r['failures']:>8d}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# TTS text chunking benchmark: legacy word-by-word splitter vs billy.gpt.text_chunker
+# Streams fake GPT tokens through each chunker into the fake ElevenLabs server
+# Reports messages sent, time to first audio and total synthesis time
+#
+# Run from the repo root:
+#   python -m bench.chunking [--replies 5] [--tokens-per-second 40]
+
+import os
+import json
+import asyncio
+import argparse
+import websockets
+
+from bench.fake_servers import FakeElevenLabs, DEFAULT_REPLY, _tokens
+from bench.turns import percentile
+
+REPLIES = [
+    DEFAULT_REPLY,
+    "Hasta la vista, baby! Nobody asks the fish about his feelings, ja? I am a salmon of action.",
+    "Listen to me very carefully. The secret to a long life is simple: swim upstream, eat your "
+    "vegetables, and never, ever trust a bear with a fishing rod.",
+]
+
+# 🐌 The splitter billy shipped with: yields at every space or punctuation mark
+async def legacy_text_chunker(text_iterator):
+    splitters = (".", ",", "?", "!", ";", ":", "—", "-", "(", ")", "[", "]", "}", " ")
+    buffer = ""
+    async for text in text_iterator:
+        if buffer.endswith(splitters):
+            yield buffer if buffer.endswith(" ") else buffer + " "
+            buffer = text
+        elif text.startswith(splitters):
+            output = buffer + text[0]
+            yield output if output.endswith(" ") else output + " "
+            buffer = text[1:]
+        else:
+            buffer += text
+    if buffer != "":
+        yield buffer + " "
+
+async def fake_gpt(reply, tokens_per_second):
+    for token in _tokens(reply):
+        await asyncio.sleep(1 / tokens_per_second)
+        yield token
+
+# 🎙 One reply over one socket, timed from the first GPT token
+async def synthesize(url, chunker, reply, tokens_per_second, flush_first):
+    ws = await websockets.connect(f"{url}/v1/text-to-speech/bench/stream-input")
+    await ws.send(json.dumps({
+        "text": " ", "xi_api_key": "bench",
+        "generation_config": {"chunk_length_schedule": [50]},
+    }))
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    first_audio = None
+    messages = 0
+
+    async def send():
+        nonlocal messages
+        async for text in chunker(fake_gpt(reply, tokens_per_second)):
+            message = {"text": text, "try_trigger_generation": True}
+            if flush_first and messages == 0:
+                message["flush"] = True
+            await ws.send(json.dumps(message))
+            messages += 1
+        await ws.send(json.dumps({"text": ""}))
+
+    async def receive():
+        nonlocal first_audio
+        async for raw in ws:
+            data = json.loads(raw)
+            if data.get("audio") and first_audio is None:
+                first_audio = loop.time() - started
+            elif data.get("isFinal"):
+                return loop.time() - started
+
+    _, total = await asyncio.gather(send(), receive())
+    await ws.close()
+    return {"messages": messages, "ttfa_ms": first_audio * 1000, "total_ms": total * 1000}
+
+# ✅ GPT stalls right after its first word: the first deadline still gets it to TTS
+async def check_stalled_first_word():
+    from billy.gpt import text_chunker, chunk_policy
+
+    async def stalled_gpt():
+        yield "Yah"
+        await asyncio.sleep(chunk_policy.first_deadline + 0.5)
+        yield "! I'll be back."
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    chunks = text_chunker(stalled_gpt())
+    first = await chunks.__anext__()
+    waited = loop.time() - started
+    await chunks.aclose()
+    if first != "Yah" or waited > chunk_policy.first_deadline + 0.1:
+        raise SystemExit(f"❌ Stalled first word: got {first!r} after {waited * 1000:.0f} ms")
+    print(f"✅ Stalled first word flushed after {waited * 1000:.0f} ms")
+
+async def run(args):
+    from billy.gpt import text_chunker
+    await check_stalled_first_word()
+    server = await FakeElevenLabs(connect_latency=0, first_audio_latency=args.first_audio_latency,
+                                  generation_latency=args.generation_latency,
+                                  message_latency=args.message_latency).start()
+    strategies = [("legacy", legacy_text_chunker, False), ("adaptive", text_chunker, True)]
+    print(f"{'chunker':<10}{'messages':>10}{'generations':>13}{'ttfa p50':>10}{'ttfa p95':>10}{'total p50':>11}")
+    for name, chunker, flush_first in strategies:
+        results = []
+        generations0 = server.generations
+        for i in range(args.replies):
+            reply = REPLIES[i % len(REPLIES)]
+            results.append(await synthesize(server.base_url, chunker, reply, args.tokens_per_second, flush_first))
+        ttfa = [r["ttfa_ms"] for r in results]
+        total = [r["total_ms"] for r in results]
+        messages = sum(r["messages"] for r in results) / len(results)
+        generations = (server.generations - generations0) / len(results)
+        print(f"{name:<10}{messages:>10.1f}{generations:>13.1f}{percentile(ttfa, 0.5):>10.0f}"
+              f"{percentile(ttfa, 0.95):>10.0f}{percentile(total, 0.5):>11.0f}")
+    await server.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare TTS chunking strategies offline.")
+    parser.add_argument("--replies", type=int, default=6)
+    parser.add_argument("--tokens-per-second", type=float, default=40.0)
+    parser.add_argument("--first-audio-latency", type=float, default=0.3)
+    parser.add_argument("--generation-latency", type=float, default=0.1)
+    parser.add_argument("--message-latency", type=float, default=0.003)
+    args = parser.parse_args()
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
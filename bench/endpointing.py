@@ -0,0 +1,148 @@
+# Offline endpointing evaluation: fixed 800 ms silence vs billy.endpoint at each aggressiveness
+# Replays sessions frame by frame through billy.vad + billy.endpoint (no devices, no network)
+# Reports end-of-turn delay after the real end of speech and how often a turn was cut early
+#
+# Sessions are 16 kHz mono WAVs, each with an optional JSON sidecar (same name, .json):
+#   {"end_s": 3.2, "partials": [[2.1, "tell me about the ocean and"], [3.2, "... fish?"]]}
+# end_s is when the speaker really finished; each partial is the transcript so far and the
+# time that phrase ended. Incremental transcription is simulated on top: the phrase is cut
+# after segment_pause_ms and its text arrives --upload-ms later. Without a sidecar, end_s is
+# the last frame billy.vad calls speech.
+#
+# Run from the repo root:
+#   python -m bench.endpointing [--sessions recordings/] [--noise 300] [--upload-ms 260]
+
+import os
+import json
+import wave
+import argparse
+import numpy as np
+
+from bench.turns import load_utterance, percentile
+
+RATE = 16000
+
+# 🗣 Synthetic sessions covering the cases the endpointer is meant to tell apart
+def synthetic_sessions(noise=300.0, seed=0):
+    rng = np.random.default_rng(seed)
+
+    def speech(seconds, fade=False):
+        x = np.frombuffer(load_utterance(seconds=seconds), dtype=np.int16).astype(np.float32)
+        if fade:
+            n = int(0.4 * RATE)
+            x[-n:] *= np.linspace(1.0, 0.1, n)
+        return x
+
+    def gap(seconds):
+        return np.zeros(int(seconds * RATE), dtype=np.float32)
+
+    def session(name, parts, partials):
+        lead = gap(0.5)
+        audio = np.concatenate([lead] + parts + [gap(2.0)])
+        end_s = (len(audio) - int(2.0 * RATE)) / RATE
+        audio += rng.normal(0, noise, len(audio)).astype(np.float32)
+        pcm = np.clip(audio, -32768, 32767).astype(np.int16).tobytes()
+        return name, pcm, {"end_s": end_s, "partials": [[t + len(lead) / RATE, text] for t, text in partials]}
+
+    return [
+        session("short yes", [speech(0.5)], []),
+        session("question", [speech(2.4)], [[2.4, "What is your name, fish?"]]),
+        session("hesitation", [speech(1.8), gap(0.6), speech(1.6)],
+                [[1.8, "Tell me about the ocean and"], [4.0, "Tell me about the ocean and the bears."]]),
+        session("trailing off", [speech(1.6, fade=True), gap(0.55), speech(1.2)], []),
+        session("um pause", [speech(1.6), gap(0.7), speech(1.0)],
+                [[1.6, "So my favourite fish is, um"], [3.3, "So my favourite fish is, um, you."]]),
+        session("long statement", [speech(4.0)], [[4.0, "I caught a huge trout last summer at the lake."]]),
+    ]
+
+def load_sessions(directory):
+    sessions = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".wav"):
+            continue
+        with wave.open(os.path.join(directory, name), "rb") as wf:
+            if wf.getframerate() != RATE or wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+                raise SystemExit(f"{name}: need 16 kHz mono 16-bit WAV")
+            pcm = wf.readframes(wf.getnframes())
+        meta = {}
+        sidecar = os.path.join(directory, name[:-4] + ".json")
+        if os.path.exists(sidecar):
+            with open(sidecar) as f:
+                meta = json.load(f)
+        sessions.append((name, pcm, meta))
+    return sessions
+
+# ⏹ The old rule: N silent chunks in a row
+class FixedSilence:
+    reason = "fixed"
+
+    def __init__(self, silence_ms=800, frame_ms=30):
+        self.limit = silence_ms // frame_ms
+        self.silent = 0
+
+    def update(self, frame, cue=None, pending=None):
+        self.silent = 0 if frame.speech else self.silent + 1
+        return self.silent > self.limit
+
+def replay(pcm, meta, endpointer, upload_s):
+    from billy.vad import SpeechDetector
+    from billy.config import segment_pause_ms
+    detector = SpeechDetector()
+    frames = detector.process(pcm)
+    frame_s = detector.samples / RATE
+    partials = meta.get("partials", [])
+    end_s = meta.get("end_s")
+    if end_s is None:
+        voiced = [i for i, f in enumerate(frames) if f.speech]
+        end_s = (voiced[-1] + 1) * frame_s if voiced else 0.0
+
+    speaking = False
+    for i, frame in enumerate(frames):
+        now = (i + 1) * frame_s
+        if not speaking:
+            speaking = frame.speech
+            if speaking:
+                endpointer.update(frame)
+            continue
+        cut_s = segment_pause_ms / 1000
+        known = [text for t, text in partials if t + cut_s + upload_s <= now]
+        waiting = any(t + cut_s <= now < t + cut_s + upload_s for t, _ in partials)
+        if endpointer.update(frame, lambda: None if waiting or not known else known[-1], lambda: waiting):
+            return now - end_s, endpointer.reason
+    return None, "never"
+
+def evaluate(sessions, upload_s=0.26, verbose=False):
+    from billy.endpoint import Endpointer, LEVELS
+    strategies = [("fixed 800", lambda: FixedSilence())]
+    strategies += [(f"level {level}", lambda level=level: Endpointer(aggressiveness=level))
+                   for level in range(len(LEVELS))]
+    print(f"{'strategy':<12}{'delay p50':>11}{'delay p95':>11}{'mean':>8}{'early cuts':>12}")
+    for label, make in strategies:
+        delays, early = [], 0
+        for name, pcm, meta in sessions:
+            delay, reason = replay(pcm, meta, make(), upload_s)
+            if delay is None:
+                continue
+            if delay < 0:
+                early += 1
+            else:
+                delays.append(delay * 1000)
+            if verbose:
+                print(f"   {label:<10} {name:<16} {delay * 1000:>7.0f} ms  {reason}")
+        mean = sum(delays) / len(delays) if delays else 0.0
+        print(f"{label:<12}{percentile(delays, 0.5):>11.0f}{percentile(delays, 0.95):>11.0f}"
+              f"{mean:>8.0f}{early:>7d}/{len(sessions):<4}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate endpointing offline.")
+    parser.add_argument("--sessions", help="Directory of 16 kHz mono WAVs (+ optional .json sidecars)")
+    parser.add_argument("--noise", type=float, default=300.0, help="Noise RMS for synthetic sessions")
+    parser.add_argument("--upload-ms", type=float, default=260.0, help="Simulated partial transcript latency")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+    sessions = load_sessions(args.sessions) if args.sessions else synthetic_sessions(args.noise)
+    evaluate(sessions, args.upload_ms / 1000, args.verbose)
+
+if __name__ == "__main__":
+    main()
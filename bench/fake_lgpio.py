@@ -0,0 +1,72 @@
+# Simulated lgpio for running billy without /dev/gpiochip0
+# Records every output write with a timestamp; press() fires button alerts
+
+import time
+import threading
+
+FALLING_EDGE = 2
+RISING_EDGE = 1
+BOTH_EDGES = 3
+
+writes = []  # (time.monotonic(), gpio or group leader, level or bits)
+_levels = {}
+_callbacks = []
+_lock = threading.Lock()
+
+def gpiochip_open(chip):
+    return chip
+
+def gpiochip_close(handle):
+    pass
+
+def gpio_claim_output(handle, gpio, level=0, lFlags=0):
+    _levels[gpio] = level
+
+def gpio_claim_input(handle, gpio, lFlags=0):
+    _levels[gpio] = 1
+
+def gpio_claim_alert(handle, gpio, eFlags, lFlags=0, notify_handle=None):
+    _levels[gpio] = 1
+
+def gpio_set_debounce_micros(handle, gpio, debounce_micros):
+    pass
+
+def group_claim_output(handle, gpios, levels=None, lFlags=0):
+    for gpio in gpios:
+        _levels[gpio] = 0
+
+def gpio_write(handle, gpio, level):
+    with _lock:
+        _levels[gpio] = level
+        writes.append((time.monotonic(), gpio, level))
+
+def group_write(handle, gpio, group_bits, group_mask=0xFFFFFFFFFFFFFFFF):
+    with _lock:
+        writes.append((time.monotonic(), gpio, group_bits))
+
+def gpio_read(handle, gpio):
+    return _levels.get(gpio, 1)
+
+class _Callback:
+    def __init__(self, gpio, edge, func):
+        self.gpio = gpio
+        self.edge = edge
+        self.func = func
+
+    def cancel(self):
+        if self in _callbacks:
+            _callbacks.remove(self)
+
+def callback(handle, gpio, edge=RISING_EDGE, func=None):
+    cb = _Callback(gpio, edge, func)
+    _callbacks.append(cb)
+    return cb
+
+# 🎬 Simulate a button press (falling edge) on the alert thread
+def press(gpio):
+    def fire():
+        stamp = time.time_ns()
+        for cb in list(_callbacks):
+            if cb.gpio == gpio and cb.edge & FALLING_EDGE and cb.func:
+                cb.func(0, gpio, 0, stamp)
+    threading.Thread(target=fire, name="fake-lgpio-alert").start()
@@ -0,0 +1,152 @@
+# File-backed PyAudio replacement
+# Input streams play queued PCM (then silence) in real time through the stream callback
+# Output streams consume written audio at the device rate and count what was played
+
+import time
+import threading
+import collections
+
+paInt16 = 8
+paContinue = 0
+paComplete = 1
+paInputOverflow = 2
+
+speed = 1.0  # >1 runs the simulated devices faster than real time
+native_rate = None  # Set to e.g. 48000 to simulate a card that only runs at one rate
+inputs = []
+outputs = []
+
+def get_sample_size(format):
+    return 2
+
+class PyAudio:
+    def open(self, format=paInt16, channels=1, rate=16000, input=False, output=False,
+             frames_per_buffer=1024, start=True, stream_callback=None, **kwargs):
+        if input:
+            stream = InputStream(rate, channels, frames_per_buffer, stream_callback)
+            inputs.append(stream)
+        else:
+            stream = OutputStream(rate, channels)
+            outputs.append(stream)
+        if start:
+            stream.start_stream()
+        return stream
+
+    def get_sample_size(self, format):
+        return 2
+
+    def get_default_input_device_info(self):
+        return {"index": 0, "name": "fake mic", "defaultSampleRate": float(native_rate or 16000)}
+
+    def get_default_output_device_info(self):
+        return {"index": 1, "name": "fake speaker", "defaultSampleRate": float(native_rate or 22050)}
+
+    def get_device_count(self):
+        return 2
+
+    def get_device_info_by_index(self, index):
+        if index == 0:
+            return dict(self.get_default_input_device_info(), maxInputChannels=1, maxOutputChannels=0)
+        return dict(self.get_default_output_device_info(), maxInputChannels=0, maxOutputChannels=1)
+
+    def is_format_supported(self, rate, **kwargs):
+        if native_rate is not None and rate != native_rate:
+            raise ValueError("Invalid sample rate", -9997)
+        return True
+
+    def terminate(self):
+        pass
+
+class InputStream:
+    def __init__(self, rate, channels, frames_per_buffer, callback):
+        self.rate = rate
+        self.bytes_per_buffer = frames_per_buffer * channels * 2
+        self.period = frames_per_buffer / rate
+        self.callback = callback
+        self.pending = collections.deque()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.active = False
+
+    # 🎙 Queue PCM to be "spoken" into the mic
+    def feed(self, pcm):
+        with self.lock:
+            for i in range(0, len(pcm), self.bytes_per_buffer):
+                self.pending.append(pcm[i:i + self.bytes_per_buffer].ljust(self.bytes_per_buffer, b"\0"))
+
+    def idle(self):
+        return not self.pending
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while self.active:
+            with self.lock:
+                data = self.pending.popleft() if self.pending else b"\0" * self.bytes_per_buffer
+            self.callback(data, len(data) // 2, {}, 0)
+            next_tick += self.period / speed
+            time.sleep(max(0, next_tick - time.monotonic()))
+
+    def start_stream(self):
+        if not self.active:
+            self.active = True
+            self.thread = threading.Thread(target=self._run, name="fake-pyaudio-input", daemon=True)
+            self.thread.start()
+
+    def stop_stream(self):
+        self.active = False
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def is_active(self):
+        return self.active
+
+    def is_stopped(self):
+        return not self.active
+
+    def close(self):
+        self.stop_stream()
+
+class OutputStream:
+    def __init__(self, rate, channels, buffer_s=0.05):
+        self.bytes_per_second = rate * channels * 2
+        self.buffer_s = buffer_s
+        self.play_end = 0.0  # Monotonic time the queued audio finishes
+        self.bytes_played = 0
+        self.writes = 0
+        self.underruns = 0
+        self.active = True
+
+    # 🔊 Blocks like a real device: returns once the data fits in the hardware buffer
+    def write(self, data, num_frames=None, exception_on_underflow=False):
+        if not isinstance(data, bytes):  # Same rule as PyAudio's C write ("s#")
+            raise TypeError(f"argument 1 must be read-only bytes-like object, not {type(data).__name__}")
+        now = time.monotonic()
+        if self.writes and now > self.play_end:
+            self.underruns += 1
+        start = max(now, self.play_end)
+        self.play_end = start + len(data) / self.bytes_per_second / speed
+        self.bytes_played += len(data)
+        self.writes += 1
+        time.sleep(max(0, self.play_end - self.buffer_s / speed - time.monotonic()))
+
+    def get_output_latency(self):
+        return self.buffer_s / speed
+
+    def get_write_available(self):
+        return int(self.buffer_s * self.bytes_per_second / 2)
+
+    def start_stream(self):
+        self.active = True
+
+    def stop_stream(self):
+        time.sleep(max(0, self.play_end - time.monotonic()))
+        self.active = False
+
+    def is_active(self):
+        return self.active
+
+    def is_stopped(self):
+        return not self.active
+
+    def close(self):
+        self.active = False
@@ -0,0 +1,253 @@
+# Local stand-ins for the OpenAI and ElevenLabs endpoints
+# FakeOpenAI: streaming chat completions (SSE) + transcriptions over plain HTTP/1.1
+# FakeElevenLabs: stream-input WebSocket with configurable latency and chunk sizes
+
+import os
+import json
+import math
+import time
+import base64
+import asyncio
+import websockets
+
+DEFAULT_REPLY = (
+    "Yah! I'll be back! You want to know my secret? I eat plankton for breakfast, "
+    "and I never skip leg day. Get to da choppah!"
+)
+
+class FakeOpenAI:
+    def __init__(self, reply=DEFAULT_REPLY, transcript="What is your name, fish?",
+                 transcribe_latency=0.25, first_token_latency=0.35, tokens_per_second=60.0,
+                 prefill_s_per_1k_tokens=0.04):
+        self.reply = reply
+        self.transcript = transcript
+        self.transcribe_latency = transcribe_latency
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.prefill_s_per_1k_tokens = prefill_s_per_1k_tokens  # Uncached prompt tokens cost time
+        self.prompts = []  # Recent prompts, for the prefix cache
+        self.server = None
+        self.port = None
+        self.requests = []  # (path, body bytes)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                path, headers, body = request
+                self.requests.append((path, len(body)))
+                if path.endswith("/chat/completions"):
+                    await self._chat(writer, json.loads(body))
+                elif path.endswith("/audio/transcriptions"):
+                    await asyncio.sleep(self.transcribe_latency)
+                    _send_json(writer, {"text": self.transcript})
+                else:
+                    _send_json(writer, {"error": {"message": "not found"}}, status="404 Not Found")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass  # Client went away, or we're shutting down
+        finally:
+            writer.close()
+
+    async def _chat(self, writer, request):
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+        )
+        base = {"id": "chatcmpl-bench", "object": "chat.completion.chunk",
+                "created": int(time.time()), "model": request.get("model", "gpt-4o-mini")}
+
+        def event(payload):
+            data = f"data: {json.dumps({**base, **payload})}\n\n".encode()
+            writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+        # Prompt cache like the real API: the longest prefix seen recently, in 128-token
+        # blocks, once it reaches 1024 tokens (~4 chars per token)
+        prompt = json.dumps(request.get("messages", []))
+        prompt_tokens = len(prompt) // 4
+        prefix = max((len(os.path.commonprefix([prompt, p])) for p in self.prompts), default=0) // 4
+        cached = prefix // 128 * 128 if prefix >= 1024 else 0
+        self.prompts = (self.prompts + [prompt])[-8:]
+        await asyncio.sleep(self.first_token_latency
+                            + self.prefill_s_per_1k_tokens * (prompt_tokens - cached) / 1000)
+        event({"choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]})
+        for token in _tokens(self.reply):
+            event({"choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]})
+            await writer.drain()
+            await asyncio.sleep(1 / self.tokens_per_second)
+        event({"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        if request.get("stream_options", {}).get("include_usage"):
+            event({"choices": [], "usage": {
+                "prompt_tokens": prompt_tokens, "completion_tokens": len(self.reply) // 4,
+                "total_tokens": prompt_tokens + len(self.reply) // 4,
+                "prompt_tokens_details": {"cached_tokens": cached},
+            }})
+        done = b"data: [DONE]\n\n"
+        writer.write(f"{len(done):x}\r\n".encode() + done + b"\r\n0\r\n\r\n")
+
+class FakeElevenLabs:
+    def __init__(self, connect_latency=0.15, first_audio_latency=0.3, generation_latency=0.1,
+                 message_latency=0.003, chunk_bytes=8820, seconds_per_char=0.06,
+                 realtime_factor=4.0, rate=22050):
+        self.connect_latency = connect_latency
+        self.first_audio_latency = first_audio_latency
+        self.generation_latency = generation_latency  # Per generation run after the first
+        self.message_latency = message_latency        # Per inbound frame (parse + queue)
+        self.chunk_bytes = chunk_bytes
+        self.seconds_per_char = seconds_per_char
+        self.realtime_factor = realtime_factor  # Synthesis speed vs playback speed
+        self.rate = rate
+        self.server = None
+        self.port = None
+        self.sessions = 0
+        self.messages = 0
+        self.generations = 0
+
+    @property
+    def base_url(self):
+        return f"ws://127.0.0.1:{self.port}"
+
+    async def start(self):
+        self.server = await websockets.serve(self._handle, "127.0.0.1", 0)
+        self.port = next(iter(self.server.sockets)).getsockname()[1]
+        return self
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    # Text is buffered like the real service: generation starts once chunk_length_schedule
+    # is reached, on "flush", or at the end of input
+    async def _handle(self, ws, path=None):
+        await asyncio.sleep(self.connect_latency)  # DNS + TLS + upgrade on the real thing
+        self.sessions += 1
+        pending = asyncio.Queue()
+        aligned = "sync_alignment=true" in (path or ws.request.path)
+        sender = asyncio.create_task(self._send_audio(ws, pending, aligned))
+        schedule = [120, 160, 250, 290]
+        buffer = ""
+        runs = 0
+        try:
+            async for message in ws:
+                self.messages += 1
+                await asyncio.sleep(self.message_latency)
+                data = json.loads(message)
+                if "xi_api_key" in data:
+                    schedule = data.get("generation_config", {}).get("chunk_length_schedule", schedule)
+                    continue
+                text = data.get("text", "")
+                if text == "":
+                    if buffer.strip():
+                        await pending.put(buffer)
+                    await pending.put("")
+                    break
+                buffer += text
+                threshold = schedule[min(runs, len(schedule) - 1)]
+                if buffer.strip() and (data.get("flush") or len(buffer) >= threshold):
+                    await pending.put(buffer)
+                    buffer = ""
+                    runs += 1
+            await sender
+        except websockets.ConnectionClosed:
+            sender.cancel()
+
+    # Alignment like the real service: each character's start, in ms from the start of its message
+    async def _send_audio(self, ws, pending, aligned=False):
+        first = True
+        while True:
+            text = await pending.get()
+            if text == "":
+                await ws.send(json.dumps({"isFinal": True}))
+                return
+            self.generations += 1
+            await asyncio.sleep(self.first_audio_latency if first else self.generation_latency)
+            first = False
+            pcm = _speech_like(len(text) * self.seconds_per_char, self.rate)
+            char_ms = self.seconds_per_char * 1000
+            for i in range(0, len(pcm), self.chunk_bytes):
+                chunk = pcm[i:i + self.chunk_bytes]
+                await asyncio.sleep(len(chunk) / (2 * self.rate) / self.realtime_factor)
+                message = {"audio": base64.b64encode(chunk).decode()}
+                if aligned:
+                    begin_ms = i / 2 / self.rate * 1000
+                    end_ms = (i + len(chunk)) / 2 / self.rate * 1000
+                    chars = [k for k in range(len(text)) if begin_ms <= k * char_ms < end_ms]
+                    message["alignment"] = {
+                        "chars": [text[k] for k in chars],
+                        "charStartTimesMs": [round(k * char_ms - begin_ms) for k in chars],
+                        "charDurationsMs": [round(char_ms)] * len(chars),
+                    }
+                await ws.send(json.dumps(message))
+
+# 🔊 Syllable-shaped tone so lip-sync and VAD have something real to chew on
+def _speech_like(seconds, rate):
+    import numpy as np
+    t = np.arange(int(seconds * rate)) / rate
+    envelope = np.clip(np.sin(2 * math.pi * 4 * t), 0, None)
+    voice = sum(np.sin(2 * math.pi * 140 * k * t) / k for k in range(1, 6))
+    return (voice * envelope * 6000).astype(np.int16).tobytes()
+
+def _tokens(text):
+    words = text.split(" ")
+    return [w if i == 0 else " " + w for i, w in enumerate(words)]
+
+async def _read_request(reader):
+    line = await reader.readline()
+    if not line:
+        return None
+    _, path, _ = line.decode().split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, value = line.decode().split(":", 1)
+        headers[key.strip().lower()] = value.strip()
+    if headers.get("transfer-encoding") == "chunked":
+        body = b""
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            if size == 0:
+                await reader.readline()
+                break
+            body += await reader.readexactly(size)
+            await reader.readline()
+    else:
+        body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return path, headers, body
+
+def _send_json(writer, payload, status="200 OK"):
+    body = json.dumps(payload).encode()
+    writer.write(
+        f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+
+# 🧵 Run both servers in their own process so their CPU isn't billed to billy
+def serve(conn, openai_options=None, elevenlabs_options=None):
+    async def run():
+        fake_openai = await FakeOpenAI(**(openai_options or {})).start()
+        fake_elevenlabs = await FakeElevenLabs(**(elevenlabs_options or {})).start()
+        conn.send((fake_openai.base_url, fake_elevenlabs.base_url))
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, conn.recv)  # Parent says stop
+        conn.send({"elevenlabs_sessions": fake_elevenlabs.sessions,
+                   "elevenlabs_messages": fake_elevenlabs.messages,
+                   "elevenlabs_generations": fake_elevenlabs.generations,
+                   "openai_requests": fake_openai.requests})
+    asyncio.run(run())
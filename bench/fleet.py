@@ -0,0 +1,115 @@
+# Fleet benchmark: N fish in one process against the local stand-ins (fleet.py)
+# Every fish has its own fake mic, speaker and pins, and its own simulated user
+# Reports per-fish and aggregate throughput, latency and CPU, to size the host
+#
+# Run from the repo root:
+#   python -m bench.fleet [--fish 4] [--turns 3] [--stagger 0.5]
+
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import multiprocessing
+
+from bench import fake_lgpio, fake_servers
+from bench.turns import install_fakes, load_utterance, percentile, simulated_user
+
+# 🐟 One fish's conversation, inside its own context
+async def drive(fish, utterance, turns, delay_s, lead_in_s=0.3, reaction_s=0.3):
+    import main as billy_main
+    from billy.hardware import button_pressed, button
+    from billy.devices import devices
+    from billy.playback import playback
+    from billy.pipeline import Conversation
+    from billy.resample import Resampler
+
+    fish.activate()
+    billy_main.start_fish()
+    fish.started = time.monotonic()
+    try:
+        await asyncio.sleep(delay_s)
+        mic = devices.input_stream
+        speaker = devices.output_stream
+        silence = b"\0" * int(lead_in_s * devices.input_device_rate) * 2
+        utterance = Resampler(devices.input_rate, devices.input_device_rate).process(utterance)
+        waiter = asyncio.create_task(button_pressed())
+        await asyncio.sleep(0.05)
+        fake_lgpio.press(fish.parts["hardware"].button_pin)
+        await waiter
+        mic.feed(silence + utterance)
+        user = asyncio.create_task(simulated_user(mic, speaker, utterance, turns, reaction_s))
+        await Conversation(on_turn=fish.on_turn).run(button.pressed_at, max_turns=turns)
+        gaps = await user
+        await playback.wait_depth(0)
+        return gaps
+    finally:
+        billy_main.stop_fish()
+
+async def run_fleet(count, turns, utterance, stagger_s):
+    from fleet import Fleet, Fish
+    from billy.tts import tts_policy
+
+    fleet = Fleet([
+        Fish(f"fish{i}", pins={"button": 100 + 4 * i, "mouth": 101 + 4 * i, "tail": 102 + 4 * i, "tail_2": 103 + 4 * i},
+             input_device="fake mic", output_device="fake speaker")
+        for i in range(count)
+    ])
+    fleet.start()
+    await asyncio.sleep(0.5)  # Let the pool warm its sockets
+    gaps = await asyncio.gather(*(drive(fish, utterance, turns, i * stagger_s) for i, fish in enumerate(fleet.fish)))
+    report = fleet.stats()
+    for (name, stats), fish_gaps in zip(report["fish"].items(), gaps):
+        stats["reply_gap_p50_ms"] = round(percentile(fish_gaps, 0.5), 1)
+    fleet.write_metrics(report)
+    tts_policy.stop()
+    return report
+
+def print_report(report):
+    print(f"\n🐠 Fleet benchmark: {len(report['fish'])} fish")
+    print(f"{'fish':<10}{'turns':>7}{'turns/min':>11}{'resp p50':>10}{'resp p95':>10}{'gap p50':>9}"
+          f"{'dropped':>9}{'underruns':>11}")
+    for name, s in report["fish"].items():
+        print(f"{name:<10}{s['turns']:>7}{s['turns_per_min']:>11.1f}{s['response_latency_p50_ms']:>10.0f}"
+              f"{s['response_latency_p95_ms']:>10.0f}{s['reply_gap_p50_ms']:>9.0f}{s['capture_dropped']:>9}"
+              f"{s['playback_underruns']:>11}")
+    count = len(report["fish"])
+    print(f"fleet: {report['turns_per_min']:.1f} turns/min, CPU {report['cpu_pct']:.1f}% "
+          f"({report['cpu_pct'] / count:.1f}% per fish), response p50 {report['response_latency_p50_ms']:.0f} ms "
+          f"/ p95 {report['response_latency_p95_ms']:.0f} ms")
+    print(f"tts pool: {report['tts_pool']}  tts: {report['tts']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several fish in one process against local stand-ins.")
+    parser.add_argument("--fish", type=int, default=4)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--stagger", type=float, default=0.5, help="Seconds between fish starting")
+    parser.add_argument("--input", help="16 kHz mono WAV to speak into every fake mic")
+    parser.add_argument("--first-token-latency", type=float, default=0.35)
+    parser.add_argument("--transcribe-latency", type=float, default=0.25)
+    parser.add_argument("--json", help="Write the full report here")
+    args = parser.parse_args()
+
+    parent, child = multiprocessing.Pipe()
+    servers = multiprocessing.Process(target=fake_servers.serve, args=(child, {
+        "first_token_latency": args.first_token_latency,
+        "transcribe_latency": args.transcribe_latency,
+    }, {}), daemon=True)
+    servers.start()
+    openai_url, elevenlabs_url = parent.recv()
+
+    with tempfile.TemporaryDirectory(prefix="billy-fleet-") as workdir:
+        install_fakes(workdir, openai_url, elevenlabs_url)
+        report = asyncio.run(run_fleet(args.fish, args.turns, load_utterance(args.input), args.stagger))
+
+    parent.send("stop")
+    parent.recv()
+    servers.join(timeout=5)
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# TTS backend benchmark: ElevenLabs stream-input (fake server, warm socket) vs local Piper
+# Fake GPT tokens go through billy.gpt.text_chunker into each backend, timed from the first token
+# Reports time to first audio, total synthesis time and real-time factor (synthesis / audio)
+# Piper uses BILLY_PIPER_VOICE if it exists, else the "tone" stand-in (process plumbing only)
+#
+# Run from the repo root:
+#   python -m bench.tts [--replies 6] [--tokens-per-second 40] [--voice path/to/voice.onnx]
+
+import os
+import time
+import asyncio
+import argparse
+
+from bench.fake_servers import FakeElevenLabs
+from bench.chunking import REPLIES, fake_gpt, synthesize
+from bench.turns import percentile
+
+# 🖥 One reply through a Piper session, timed from the first GPT token
+async def synthesize_local(engine, chunker, reply, tokens_per_second):
+    session = await engine.open()
+    started = time.monotonic()
+    first_audio = None
+    audio_bytes = 0
+    messages = 0
+
+    async def send():
+        nonlocal messages
+        async for text in chunker(fake_gpt(reply, tokens_per_second)):
+            await session.send(text)
+            messages += 1
+        await session.finish()
+
+    async def receive():
+        nonlocal first_audio, audio_bytes
+        async for pcm in session.audio():
+            if first_audio is None:
+                first_audio = time.monotonic() - started
+            audio_bytes += len(pcm)
+        return time.monotonic() - started
+
+    _, total = await asyncio.gather(send(), receive())
+    return {"messages": messages, "ttfa_ms": first_audio * 1000, "total_ms": total * 1000,
+            "audio_s": audio_bytes / 2 / engine.rate}
+
+def report(name, results):
+    ttfa = [r["ttfa_ms"] for r in results]
+    total = [r["total_ms"] for r in results]
+    rtf = [r["total_ms"] / 1000 / r["audio_s"] for r in results if r.get("audio_s")]
+    rtf = f"{percentile(rtf, 0.5):.2f}" if rtf else "-"
+    print(f"{name:<12}{percentile(ttfa, 0.5):>10.0f}{percentile(ttfa, 0.95):>10.0f}"
+          f"{percentile(total, 0.5):>11.0f}{rtf:>8}")
+
+async def run(args):
+    from billy.gpt import text_chunker
+    from billy.config import playback_rate
+    from billy.piper_tts import PiperEngine
+
+    print(f"{'backend':<12}{'ttfa p50':>10}{'ttfa p95':>10}{'total p50':>11}{'rtf':>8}")
+
+    server = await FakeElevenLabs(connect_latency=0, first_audio_latency=args.first_audio_latency,
+                                  generation_latency=args.generation_latency).start()
+    results = []
+    for i in range(args.replies):
+        results.append(await synthesize(server.base_url, text_chunker, REPLIES[i % len(REPLIES)],
+                                        args.tokens_per_second, True))
+    report("elevenlabs", results)
+    await server.stop()
+
+    engine = PiperEngine(voice_path=args.voice, rate=playback_rate)
+    if not engine.available():
+        print(f"⏭ piper: no voice at {args.voice} (pip install piper-tts, or --voice tone)")
+        return
+    loaded = time.monotonic()
+    engine.start()
+    await asyncio.gather(*(worker.ready.wait() for worker in engine.workers))
+    print(f"🗣 piper voice {os.path.basename(args.voice)} loaded in {(time.monotonic() - loaded) * 1000:.0f} ms")
+    results = []
+    for i in range(args.replies):
+        results.append(await synthesize_local(engine, text_chunker, REPLIES[i % len(REPLIES)],
+                                              args.tokens_per_second))
+    report("piper", results)
+    engine.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ElevenLabs (fake server) and local Piper TTS.")
+    parser.add_argument("--replies", type=int, default=6)
+    parser.add_argument("--tokens-per-second", type=float, default=40.0)
+    parser.add_argument("--first-audio-latency", type=float, default=0.3)
+    parser.add_argument("--generation-latency", type=float, default=0.1)
+    parser.add_argument("--voice", default=None, help="Piper .onnx voice, or 'tone' (default: BILLY_PIPER_VOICE, else tone)")
+    args = parser.parse_args()
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+    if args.voice is None:
+        from billy.config import piper_voice_path
+        args.voice = piper_voice_path if os.path.exists(piper_voice_path) else "tone"
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
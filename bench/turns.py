@@ -0,0 +1,310 @@
+# Offline end-to-end benchmark of the real billy pipeline
+# Fake OpenAI + ElevenLabs servers (own process), file-backed PyAudio, simulated lgpio
+# Reports turn latency, throughput and CPU per turn
+# --conversation: a simulated user answers each reply --reaction seconds after it stops sounding;
+# reports the gap between Billy's replies, back-to-back turns vs billy.pipeline (--pipelined)
+#
+# Run from the repo root:
+#   python -m bench.turns --turns 5 [--input speech_16k.wav] [--speed 1.0] [--device-rate 48000]
+#                         [--barge-in-after 1.0] [--json out.json]
+#   python -m bench.turns --conversation [--pipelined] [--reaction 0.3] --turns 5
+
+import os
+import sys
+import json
+import math
+import time
+import wave
+import asyncio
+import argparse
+import tempfile
+import multiprocessing
+
+from bench import fake_pyaudio, fake_lgpio
+from bench import fake_servers
+
+# 🔌 Swap hardware modules + point billy at the local servers (before billy is imported)
+def install_fakes(workdir, openai_url, elevenlabs_url, speed=1.0, device_rate=None, extra_env=None):
+    fake_pyaudio.speed = speed
+    fake_pyaudio.native_rate = device_rate
+    sys.modules["pyaudio"] = fake_pyaudio
+    sys.modules["lgpio"] = fake_lgpio
+    os.environ.update({
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": openai_url,
+        "ELEVENLABS_API_KEY": "bench",
+        "ELEVENLABS_WS_BASE": elevenlabs_url,
+        "BILLY_TTS_CACHE_DIR": os.path.join(workdir, "tts"),
+        "BILLY_REPLY_CACHE_DIR": os.path.join(workdir, "replies"),
+        "BILLY_TRACE_DIR": os.path.join(workdir, "traces"),
+        "BILLY_FILLER_DIR": os.path.join(workdir, "filler"),
+        "BILLY_TRANSCRIBE_CODEC": "wav",
+    })
+    os.environ.update(extra_env or {})
+
+# 🗣 Utterance to "speak" into the fake mic (16 kHz mono int16)
+def load_utterance(path=None, seconds=1.5, rate=16000):
+    if path:
+        with wave.open(path, "rb") as wf:
+            if wf.getframerate() != rate or wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+                raise SystemExit(f"{path}: need 16 kHz mono 16-bit WAV")
+            return wf.readframes(wf.getnframes())
+    import numpy as np
+    t = np.arange(int(seconds * rate)) / rate
+    envelope = 0.3 + 0.7 * np.clip(np.sin(2 * math.pi * 3 * t), 0, None)
+    phase = 2 * math.pi * np.cumsum(120 + 20 * np.sin(2 * math.pi * 0.7 * t)) / rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 12))
+    noise = np.random.default_rng(0).normal(0, 0.05, len(t))
+    return ((voice * envelope + noise) * 5000).astype(np.int16).tobytes()
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+# ⚡ Talk over Billy `after_s` into his reply; returns how long he kept sounding afterwards
+async def barge_in_during_reply(mic, speaker, utterance, after_s):
+    from billy.tracing import tracer
+    from billy.audio import barge_in
+    while tracer.current is None or "first_sample_played" not in tracer.current["marks"]:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(after_s)
+    mic.feed(utterance)
+    while barge_in.event is None or not barge_in.event.is_set():
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.3)  # Let the writer thread finish its last block
+    return max(0.0, speaker.play_end - barge_in.triggered_at) * 1000
+
+# 🙋 Answer each reply `reaction_s` after it stops sounding; returns reply-to-reply gaps (ms)
+async def simulated_user(mic, speaker, utterance, turns, reaction_s):
+    from billy.tracing import tracer
+    gaps = []
+    for i in range(1, turns):
+        while tracer.completed < i:
+            await asyncio.sleep(0.005)
+        reply_end = speaker.play_end
+        await asyncio.sleep(max(0.0, reply_end + reaction_s - time.monotonic()))
+        mic.feed(utterance)
+        while tracer.current is None or "first_sample_played" not in tracer.current["marks"]:
+            await asyncio.sleep(0.005)
+        gaps.append((tracer.current["marks"]["first_sample_played"] - reply_end) * 1000)
+    return gaps
+
+# 🔁 One button press, `turns` turns, no waiting between them other than the user's own
+async def run_conversation(turns, utterance, lead_in_s=0.3, reaction_s=0.3, pipelined=False):
+    import main as billy_main
+    from billy.hardware import BUTTON_PIN, button_pressed, button
+    from billy.devices import devices
+    from billy.capture import capture
+    from billy.playback import playback
+    from billy.resample import Resampler
+    from billy.actuator import actuator
+    from billy.pipeline import Conversation
+    from billy.gpt import memory
+    from billy.replies import replies
+    from billy.tts import tts_policy
+
+    billy_main.startup()
+    await asyncio.sleep(0.5)
+    mic = fake_pyaudio.inputs[0]
+    speaker = fake_pyaudio.outputs[0]
+    silence = b"\0" * int(lead_in_s * devices.input_device_rate) * 2
+    utterance = Resampler(devices.input_rate, devices.input_device_rate).process(utterance)
+
+    waiter = asyncio.create_task(button_pressed())
+    await asyncio.sleep(0.05)
+    fake_lgpio.press(BUTTON_PIN)
+    await waiter
+    cpu0 = time.process_time()
+    started = time.monotonic()
+    mic.feed(silence + utterance)
+    user = asyncio.create_task(simulated_user(mic, speaker, utterance, turns, reaction_s))
+    records = []
+    if pipelined:
+        await Conversation(on_turn=records.append).run(button.pressed_at, max_turns=turns)
+    else:
+        pressed_at = button.pressed_at
+        for _ in range(turns):
+            records.append(await billy_main.converse_once(pressed_at))
+            pressed_at = None
+    gaps = await user
+    await playback.wait_depth(0)
+    await asyncio.sleep(devices.output_latency)
+    elapsed = time.monotonic() - started
+    cpu = time.process_time() - cpu0
+
+    results = [dict((record or {}).get("spans_ms", {}), **(record or {}).get("values", {}), turn=i + 1)
+               for i, record in enumerate(records)]
+    for result, gap in zip(results[1:], gaps):
+        result["reply_gap"] = gap
+    report = {
+        "mode": "pipelined" if pipelined else "serial",
+        "turns": results,
+        "elapsed_s": elapsed,
+        "turns_per_min": 60 * turns / elapsed if elapsed else 0.0,
+        "cpu_pct": 100 * cpu / elapsed if elapsed else 0.0,
+        "capture": capture.stats(),
+        "actuator": actuator.stats(),
+        "playback": playback.stats(),
+        "memory": memory.stats(),
+        "replies": replies.stats(),
+        "tts": tts_policy.stats(),
+        "speaker_underruns": speaker.underruns,
+    }
+    billy_main.shutdown()
+    return report
+
+async def run_turns(turns, utterance, lead_in_s=0.3, barge_in_after=None):
+    import main as billy_main
+    from billy.hardware import BUTTON_PIN, button_pressed, button
+    from billy.devices import devices
+    from billy.capture import capture
+    from billy.playback import playback
+    from billy.resample import Resampler
+    from billy.actuator import actuator
+    from billy.tts import tts_policy
+    from billy.phrase_cache import phrase_cache
+
+    billy_main.startup()
+    await asyncio.sleep(0.5)  # Let the pool warm its first socket, like an idle fish would
+    mic = fake_pyaudio.inputs[0]
+    speaker = fake_pyaudio.outputs[0]
+    silence = b"\0" * int(lead_in_s * devices.input_device_rate) * 2
+    utterance = Resampler(devices.input_rate, devices.input_device_rate).process(utterance)
+
+    results = []
+    started = time.monotonic()
+    for i in range(turns):
+        cpu0 = time.process_time()
+        wall0 = time.monotonic()
+        played0 = speaker.bytes_played
+        pressed_at = None
+        if i == 0:
+            waiter = asyncio.create_task(button_pressed())
+            await asyncio.sleep(0.05)
+            fake_lgpio.press(BUTTON_PIN)
+            await waiter
+            pressed_at = button.pressed_at
+        if i == 0 or barge_in_after is None:
+            mic.feed(silence + utterance)  # After a barge-in the next question is already spoken
+        interrupter = None
+        if barge_in_after is not None and i < turns - 1:
+            interrupter = asyncio.create_task(barge_in_during_reply(mic, speaker, utterance, barge_in_after))
+        record = await billy_main.converse_once(pressed_at)
+        # Playback tail: wait until the speaker has actually drained
+        await playback.wait_depth(0)
+        await asyncio.sleep(devices.output_latency)
+        cpu = time.process_time() - cpu0
+        wall = time.monotonic() - wall0
+        spans = dict((record or {}).get("spans_ms", {}), **(record or {}).get("values", {}))
+        if interrupter is not None:
+            spans["barge_in_tail_ms"] = await interrupter
+        results.append({
+            "turn": i + 1,
+            "wall_s": wall,
+            "cpu_ms": cpu * 1000,
+            "cpu_pct": 100 * cpu / wall if wall else 0.0,
+            "audio_s": (speaker.bytes_played - played0) / speaker.bytes_per_second,
+            **spans,
+        })
+    elapsed = time.monotonic() - started
+
+    report = {
+        "turns": results,
+        "elapsed_s": elapsed,
+        "turns_per_min": 60 * turns / elapsed if elapsed else 0.0,
+        "capture": capture.stats(),
+        "actuator": actuator.stats(),
+        "playback": playback.stats(),
+        "tts": tts_policy.stats(),
+        "phrase_cache": phrase_cache.stats(),
+        "speaker_underruns": speaker.underruns,
+    }
+    billy_main.shutdown()
+    return report
+
+def print_report(report):
+    turns = report["turns"]
+    keys = ("reply_gap", "reply_to_listen", "response_latency", "transcription", "gpt_first_token",
+            "gpt_ttft_ms", "prompt_tokens", "cached_prompt_tokens",
+            "tts_first_audio", "tts_first_audio_ms", "audio_to_speaker", "barge_in_tail_ms", "wall_s", "cpu_ms", "cpu_pct", "audio_s")
+    print(f"\n📊 Billy offline benchmark{' (' + report['mode'] + ' conversation)' if 'mode' in report else ''}")
+    print(f"{'metric':<20}{'p50':>10}{'p95':>10}{'max':>10}")
+    for key in keys:
+        values = [t[key] for t in turns if key in t]
+        if values:
+            print(f"{key:<20}{percentile(values, 0.5):>10.1f}{percentile(values, 0.95):>10.1f}{max(values):>10.1f}")
+    print(f"throughput: {report['turns_per_min']:.1f} turns/min over {report['elapsed_s']:.1f} s")
+    print(f"capture: {report['capture']}  speaker underruns: {report['speaker_underruns']}")
+    print(f"playback: {report['playback']}")
+    if "memory" in report:
+        print(f"memory: {report['memory']}")
+        print(f"replies: {report['replies']}")
+    print(f"tts: {report['tts']}")
+    if "phrase_cache" in report:
+        print(f"phrase cache: {report['phrase_cache']}")
+    for label, s in report["actuator"].items():
+        print(f"actuator {label}: p50 {s['p50_us']:.0f} us, p95 {s['p95_us']:.0f} us, max {s['max_us']:.0f} us")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run billy turns against local stand-ins.")
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--input", help="16 kHz mono WAV to speak into the fake mic")
+    parser.add_argument("--speed", type=float, default=1.0, help="Simulated device speed (1.0 = real time)")
+    parser.add_argument("--device-rate", type=int, help="Simulate a card that only runs at this rate")
+    parser.add_argument("--barge-in-after", type=float,
+                        help="Talk over each reply (but the last) this many seconds in")
+    parser.add_argument("--conversation", action="store_true",
+                        help="One continuous conversation with a simulated user (reports reply gaps)")
+    parser.add_argument("--pipelined", action="store_true", help="Conversation mode: use billy.pipeline")
+    parser.add_argument("--reaction", type=float, default=0.3,
+                        help="Conversation mode: seconds the user waits after a reply before answering")
+    parser.add_argument("--first-token-latency", type=float, default=0.35)
+    parser.add_argument("--transcribe-latency", type=float, default=0.25)
+    parser.add_argument("--tts-connect-latency", type=float, default=0.15)
+    parser.add_argument("--tts-first-audio-latency", type=float, default=0.3)
+    parser.add_argument("--tts-chunk-bytes", type=int, default=8820)
+    parser.add_argument("--tts-offline", action="store_true",
+                        help="ElevenLabs unreachable (set BILLY_PIPER_VOICE=tone to run without a voice model)")
+    parser.add_argument("--json", help="Write the full report here")
+    args = parser.parse_args()
+
+    parent, child = multiprocessing.Pipe()
+    servers = multiprocessing.Process(target=fake_servers.serve, args=(child, {
+        "first_token_latency": args.first_token_latency,
+        "transcribe_latency": args.transcribe_latency,
+    }, {
+        "connect_latency": args.tts_connect_latency,
+        "first_audio_latency": args.tts_first_audio_latency,
+        "chunk_bytes": args.tts_chunk_bytes,
+    }), daemon=True)
+    servers.start()
+    openai_url, elevenlabs_url = parent.recv()
+
+    with tempfile.TemporaryDirectory(prefix="billy-bench-") as workdir:
+        if args.tts_offline:
+            elevenlabs_url = "ws://127.0.0.1:9"  # Discard port: connection refused
+        install_fakes(workdir, openai_url, elevenlabs_url, speed=args.speed, device_rate=args.device_rate)
+        if args.conversation:
+            report = asyncio.run(run_conversation(args.turns, load_utterance(args.input),
+                                                  reaction_s=args.reaction, pipelined=args.pipelined))
+        else:
+            report = asyncio.run(run_turns(args.turns, load_utterance(args.input),
+                                           barge_in_after=args.barge_in_after))
+
+    parent.send("stop")
+    report["servers"] = parent.recv()
+    servers.join(timeout=5)
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    # ✅ The fake GPT gives the same multi-chunk reply every turn: its second run must come from the cache
+    if "phrase_cache" in report and args.turns > 1 and not args.tts_offline and args.barge_in_after is None:
+        if not report["phrase_cache"]["hits"]:
+            raise SystemExit("❌ Repeated reply never hit the phrase cache")
+
+if __name__ == "__main__":
+    main()
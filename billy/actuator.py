@@ -0,0 +1,143 @@
+# Dedicated real-time GPIO actuation thread
+# Consumes a time-stamped command queue so motor timing doesn't depend on the event loop
+# Scheduled-vs-actual timing histograms to prove the mouth and tail land on time
+
+import os
+import time
+import heapq
+import bisect
+import itertools
+import threading
+import collections
+from billy.hardware import GPIO, TAIL_GROUP_MASK, hardware as shared_hardware
+from billy.perfish import PerFish
+
+# Lateness buckets in microseconds (last bucket catches everything slower)
+BUCKETS_US = (100, 250, 500, 1000, 2000, 5000, 10000, 20000, 50000)
+
+class TimingHistogram:
+    def __init__(self, keep=2000):
+        self.counts = [0] * (len(BUCKETS_US) + 1)
+        self.recent = collections.deque(maxlen=keep)
+        self.max_us = 0.0
+
+    def add(self, late_us):
+        self.counts[bisect.bisect_left(BUCKETS_US, late_us)] += 1
+        self.recent.append(late_us)
+        self.max_us = max(self.max_us, late_us)
+
+    def percentile(self, p):
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def summary(self):
+        labels = [f"<={b}us" for b in BUCKETS_US] + [f">{BUCKETS_US[-1]}us"]
+        return {
+            "count": sum(self.counts),
+            "p50_us": self.percentile(50),
+            "p95_us": self.percentile(95),
+            "p99_us": self.percentile(99),
+            "max_us": self.max_us,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+class Actuator(threading.Thread):
+    def __init__(self, hardware=shared_hardware, priority=50, spin_s=0.0005):
+        super().__init__(name="billy-actuator", daemon=True)
+        self.handle = hardware.handle
+        self.mouth_pin = hardware.mouth_pin
+        self.tail_pin = hardware.tail_pin
+        self.priority = priority
+        self.spin_s = spin_s  # Busy-wait the last half millisecond instead of trusting the OS timer
+        self.heap = []
+        self.cond = threading.Condition()
+        self.seq = itertools.count()
+        self.running = False
+        self.histograms = collections.defaultdict(TimingHistogram)
+
+    # 🧵 Real-time priority if we're allowed, otherwise just a high nice level
+    def _raise_priority(self):
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(self.priority))
+            print(f"⚡ Actuator running SCHED_FIFO {self.priority}")
+        except (AttributeError, PermissionError, OSError):
+            try:
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), -10)
+            except (AttributeError, PermissionError, OSError):
+                print("ℹ️ Actuator running at normal priority (no permission for real-time)")
+
+    def start(self):
+        self.running = True
+        super().start()
+
+    def run(self):
+        self._raise_priority()
+        while True:
+            with self.cond:
+                while self.running and not self.heap:
+                    self.cond.wait()
+                if not self.running:
+                    return
+                due = self.heap[0][0]
+                wait = due - time.monotonic() - self.spin_s
+                if wait > 0:
+                    self.cond.wait(wait)
+                    continue  # Queue may have changed while we slept
+                _, _, label, kind, args = heapq.heappop(self.heap)
+            while time.monotonic() < due:
+                pass
+            if kind == "write":
+                GPIO.gpio_write(self.handle, *args)
+            else:
+                GPIO.group_write(self.handle, *args)
+            self.histograms[label].add((time.monotonic() - due) * 1e6)
+
+    def _submit(self, at, label, kind, args):
+        at = time.monotonic() if at is None else at
+        with self.cond:
+            heapq.heappush(self.heap, (at, next(self.seq), label, kind, args))
+            self.cond.notify()
+
+    # 👄 Mouth open/close at a monotonic timestamp (None = now)
+    def mouth(self, is_open, at=None):
+        self._submit(at, "mouth", "write", (self.mouth_pin, int(is_open)))
+
+    # 🐟 Head/tail pair switched together with one group write
+    def tail(self, head=False, tail=False, at=None):
+        bits = (1 if head else 0) | (2 if tail else 0)
+        self._submit(at, "tail", "group", (self.tail_pin, bits, TAIL_GROUP_MASK))
+
+    # 🧹 Forget pending commands (all, or just one label)
+    def clear(self, label=None):
+        with self.cond:
+            self.heap = [c for c in self.heap if label is not None and c[2] != label]
+            heapq.heapify(self.heap)
+            self.cond.notify()
+
+    # 🛑 Everything off right now
+    def all_off(self):
+        self.clear()
+        self.mouth(False)
+        self.tail(False, False)
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        if self.is_alive():
+            self.join(timeout=1)
+        GPIO.gpio_write(self.handle, self.mouth_pin, 0)
+        GPIO.group_write(self.handle, self.tail_pin, 0, TAIL_GROUP_MASK)
+
+    def stats(self):
+        return {label: hist.summary() for label, hist in self.histograms.items()}
+
+    def print_stats(self):
+        for label, s in self.stats().items():
+            print(f"⏱ {label}: n={s['count']} p50={s['p50_us']:.0f}us "
+                  f"p95={s['p95_us']:.0f}us max={s['max_us']:.0f}us")
+
+# 🐟 Shared actuator (started from main.py; one per fish in fleet mode)
+actuator = PerFish("actuator", Actuator)
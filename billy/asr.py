@@ -0,0 +1,177 @@
+# Speech recognizers used by billy.audio
+# Every backend has `name`, `warm()` and `async transcribe(pcm)` (16 kHz mono int16 -> text)
+# OpenAI Whisper backend for the real fish (in-memory, compressed, async upload)
+# Vosk backend: CPU-only, on the Pi, model loaded once and kept resident
+# Fallback chain picked from config: next backend on error/timeout (venue Wi-Fi drops)
+# Local stand-in recognizer so the transcription path can be exercised offline
+
+import os
+import json
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from billy.config import (
+    sample_rate, client, transcribe_codec, asr_backend, asr_timeout_s, vosk_model_path, local_workers
+)
+from billy import codec
+from billy.perfish import Shared
+
+try:
+    import vosk
+except ImportError:  # Optional: pip install vosk (+ a model, see VoskRecognizer)
+    vosk = None
+
+# ☁️ Whisper via OpenAI
+class OpenAIRecognizer:
+    name = "openai"
+
+    def __init__(self, model="whisper-1", codec_name=transcribe_codec):
+        self.model = model
+        self.codec = codec_name
+        self.last_stats = {}
+
+    def warm(self):
+        pass
+
+    async def transcribe(self, pcm):
+        t0 = time.perf_counter()
+        filename, data = await codec.encode(pcm, self.codec)
+        t1 = time.perf_counter()
+        transcript = await client.audio.transcriptions.create(model=self.model, file=(filename, data))
+        t2 = time.perf_counter()
+
+        pcm_bytes = codec.pcm_length(pcm)
+        self.last_stats = {
+            "file": filename,
+            "pcm_bytes": pcm_bytes,
+            "bytes_sent": len(data),
+            "encode_ms": (t1 - t0) * 1000,
+            "request_ms": (t2 - t1) * 1000,
+        }
+        print(f"📤 Sent {len(data)} bytes ({filename}, {pcm_bytes} raw): "
+              f"encode {self.last_stats['encode_ms']:.0f} ms, request {self.last_stats['request_ms']:.0f} ms")
+        return transcript.text
+
+# 🖥 Vosk (Kaldi) on the CPU: no network, ~0.3x real time for the small English model on a Pi 4
+# Model: https://alphacephei.com/vosk/models (unzip to BILLY_VOSK_MODEL)
+class VoskRecognizer:
+    name = "vosk"
+
+    def __init__(self, model_path=vosk_model_path, rate=sample_rate, block_bytes=8000, workers=local_workers):
+        self.model_path = model_path
+        self.rate = rate
+        self.block_bytes = block_bytes  # Fed to Kaldi in 250 ms blocks, like a live stream
+        self.model = None
+        # One model shared by `workers` decoders (Kaldi runs outside the GIL, fleet fish decode in parallel)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vosk")
+        self.last_stats = {}
+
+    @staticmethod
+    def available(model_path=vosk_model_path):
+        return vosk is not None and os.path.isdir(model_path)
+
+    # 🔥 Load the model once (seconds on a Pi), before the first utterance needs it
+    def warm(self):
+        if self.model is None:
+            if not self.available(self.model_path):
+                raise RuntimeError(f"Vosk needs `pip install vosk` and a model in {self.model_path}")
+            t0 = time.perf_counter()
+            vosk.SetLogLevel(-1)
+            self.model = vosk.Model(self.model_path)
+            print(f"🖥 Vosk model loaded in {time.perf_counter() - t0:.1f} s ({self.model_path})")
+
+    def _decode(self, pcm):
+        self.warm()
+        rec = vosk.KaldiRecognizer(self.model, self.rate)
+        view = memoryview(codec._as_bytes(pcm)).cast("B")
+        for i in range(0, len(view), self.block_bytes):
+            rec.AcceptWaveform(bytes(view[i:i + self.block_bytes]))
+        return json.loads(rec.FinalResult()).get("text", "")
+
+    async def transcribe(self, pcm):
+        t0 = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(self.executor, self._decode, pcm)
+        pcm_bytes = codec.pcm_length(pcm)
+        self.last_stats = {"pcm_bytes": pcm_bytes, "decode_ms": (time.perf_counter() - t0) * 1000}
+        print(f"🖥 Vosk: {pcm_bytes} bytes decoded in {self.last_stats['decode_ms']:.0f} ms")
+        return text
+
+# 🔀 Try backends in order; one that fails sits out for a while instead of costing every turn
+class FallbackRecognizer:
+    name = "fallback"
+
+    def __init__(self, backends, timeout=asr_timeout_s, cooldown_s=60.0):
+        self.backends = list(backends)
+        self.timeout = timeout
+        self.cooldown_s = cooldown_s
+        self.down_until = {}  # backend name -> monotonic time it may be tried again
+        self.last_backend = None
+
+        # 📊 Metrics
+        self.fallbacks = 0
+
+    def warm(self):
+        for backend in self.backends:
+            backend.warm()
+
+    async def transcribe(self, pcm):
+        now = time.monotonic()
+        chain = [b for b in self.backends if self.down_until.get(b.name, 0.0) <= now] or self.backends
+        error = None
+        for backend in chain:
+            try:
+                if backend is chain[-1]:
+                    text = await backend.transcribe(pcm)  # Last resort: a slow answer beats none
+                else:
+                    text = await asyncio.wait_for(backend.transcribe(pcm), self.timeout)
+            except Exception as e:
+                error = e
+                self.down_until[backend.name] = time.monotonic() + self.cooldown_s
+                self.fallbacks += 1
+                print(f"⚠️ {backend.name} transcription failed ({type(e).__name__}: {e}), trying the next backend")
+                continue
+            self.down_until.pop(backend.name, None)
+            self.last_backend = backend.name
+            return text
+        raise error
+
+# 🧪 Offline stand-in: scripted answers with simulated latency
+class LocalRecognizer:
+    name = "local"
+
+    def __init__(self, transcripts=None, delay=0.0, per_second=0.0):
+        self.transcripts = list(transcripts or [])
+        self.delay = delay
+        self.per_second = per_second
+        self.calls = 0
+
+    def warm(self):
+        pass
+
+    async def transcribe(self, pcm):
+        seconds = codec.pcm_length(pcm) / (2 * sample_rate)
+        await asyncio.sleep(self.delay + self.per_second * seconds)
+        self.calls += 1
+        if self.transcripts:
+            return self.transcripts.pop(0)
+        return f"[{seconds:.1f}s of speech]"
+
+BACKENDS = {"openai": OpenAIRecognizer, "vosk": VoskRecognizer, "local": LocalRecognizer}
+
+# 🔧 "openai,vosk" -> a FallbackRecognizer over the backends that can run here
+def build_recognizer(spec=asr_backend):
+    backends = []
+    for name in (n.strip() for n in spec.split(",")):
+        if name not in BACKENDS:
+            print(f"⚠️ Unknown ASR backend '{name}' (choose from {', '.join(BACKENDS)})")
+        elif name == "vosk" and not VoskRecognizer.available():
+            print(f"ℹ️ Vosk not available (pip install vosk, model in {vosk_model_path}), skipping it.")
+        else:
+            backends.append(BACKENDS[name]())
+    if not backends:
+        backends = [OpenAIRecognizer()]
+    return backends[0] if len(backends) == 1 else FallbackRecognizer(backends)
+
+# 🐟 Default backend (from BILLY_ASR), built on first use: no executor threads at import
+recognizer = Shared("recognizer", build_recognizer)
@@ -1,61 +1,242 @@
 # Voice recording using PyAudio
-# Silence detection using VAD
-# Saving audio to .wav
-# Transcription using Whisper (via OpenAI)
+# Silence detection from the shared speech-probability stream (billy.vad)
+# Adaptive end-of-turn detection (billy.endpoint)
+# Incremental transcription of finished phrases while the user is still talking
+# Transcription using Whisper (via OpenAI) or a local stand-in from billy.asr
+# Barge-in: the same capture stream watches for the user talking over Billy
 
-import pyaudio
-import wave
-import audioop
+import time
+import asyncio
 from billy.config import (
-    format, sample_rate, chunk_duration_ms, silence_duration_ms,
-    channels, frames, threshold, vad, sclient
+    chunk_duration_ms,
+    incremental_transcription, segment_pause_ms, min_segment_ms,
+    barge_in_rms, barge_in_ms
 )
+from billy.capture import capture
+from billy.playback import playback as shared_playback
+from billy.actuator import actuator as shared_actuator
+from billy.endpoint import Endpointer
+from billy.buffer import UtteranceBuffer
+from billy import asr
+from billy.tracing import tracer
+from billy.perfish import PerFish
+
+# ✂️ Cut speech into segments at short pauses and transcribe them in the background
+# Segments are zero-copy views into the recording's UtteranceBuffer
+class IncrementalTranscriber:
+    def __init__(self, recognizer, buffer, pause_ms=segment_pause_ms, min_ms=min_segment_ms):
+        self.recognizer = recognizer
+        self.buffer = buffer
+        self.pause_chunks = int(pause_ms / chunk_duration_ms)
+        self.min_chunks = int(min_ms / chunk_duration_ms)
+        self.start = 0  # Buffer offset where the current segment begins
+        self.silent_run = 0
+        self.tasks = []
+
+    @property
+    def chunks(self):
+        return (len(self.buffer) - self.start) // self.buffer.frame_bytes
+
+    # Call after the frame went into the buffer
+    def add(self, is_speech):
+        self.silent_run = 0 if is_speech else self.silent_run + 1
+        if self.chunks >= self.min_chunks and self.silent_run >= self.pause_chunks:
+            self._cut()
+
+    def _cut(self):
+        voiced = self.chunks - self.silent_run
+        if voiced > 0:
+            pcm = self.buffer.view(self.start)
+            self.tasks.append(asyncio.create_task(self.recognizer.transcribe(pcm)))
+        self.start = len(self.buffer)
+        self.silent_run = 0
+
+    # 🧵 Transcripts finished so far (used for endpointing cues)
+    def partial(self):
+        done = [t.result() for t in self.tasks if t.done() and not t.cancelled() and not t.exception()]
+        return stitch(done)
+
+    # 🧵 Full transcript, but only once nothing spoken is still waiting to be cut or uploaded
+    def settled(self):
+        if self.chunks > self.silent_run or self.pending():
+            return None
+        return self.partial()
+
+    def pending(self):
+        return not all(t.done() for t in self.tasks)
+
+    async def finish(self):
+        # Trailing endpoint silence adds upload bytes but no words
+        extra = min(self.chunks, max(0, self.silent_run - self.pause_chunks))
+        if extra:
+            self.buffer.trim(extra * self.buffer.frame_bytes)
+            self.silent_run -= extra
+        if self.chunks:
+            self._cut()
+        texts = await asyncio.gather(*self.tasks)
+        return stitch(texts)
+
+    def cancel(self):
+        for task in self.tasks:
+            task.cancel()
+
+# 🪡 Join partial transcripts, dropping a word repeated across a cut
+def stitch(texts):
+    words = []
+    for text in texts:
+        new = text.strip().split()
+        if words and new and _bare(words[-1]) == _bare(new[0]):
+            new = new[1:]
+        words.extend(new)
+    return " ".join(words)
+
+def _bare(word):
+    return word.strip(".,!?;:").lower()
+
+# ⚡ User talks over Billy: speaker + motors stop on the audio thread within the confirming
+# frame; the loop then cancels GPT/TTS and the next recording starts from the onset audio
+class BargeIn:
+    def __init__(self, capture=capture, playback=shared_playback, actuator=shared_actuator,
+                 min_rms=barge_in_rms, confirm_ms=barge_in_ms, min_prob=0.8, snr=4.0, preroll_ms=300):
+        self.capture = capture
+        self.playback = playback
+        self.actuator = actuator
+        self.min_rms = min_rms      # Billy's own voice leaks into the mic; a barge-in has to beat it
+        self.min_prob = min_prob
+        self.snr = snr              # ...and stand well clear of the room's noise floor
+        self.frames_needed = max(1, int(confirm_ms / chunk_duration_ms))
+        self.preroll = int(preroll_ms / chunk_duration_ms)
+        self.active = False
+        self.run = 0
+        self.onset = None
+        self.triggered_at = None
+        self.loop = None
+        self.event = None
+
+        # 📊 Metrics
+        self.count = 0
+
+    # 👀 Start watching (from the loop, while Billy talks)
+    def watch(self):
+        self.loop = asyncio.get_running_loop()
+        self.event = asyncio.Event()
+        self.run = 0
+        self.onset = None
+        if self._on_frame not in self.capture.listeners:
+            self.capture.listeners.append(self._on_frame)
+        self.active = True
+
+    def unwatch(self):
+        self.active = False
+
+    # 🧵 Audio thread (capture lock held)
+    def _on_frame(self, frame):
+        if not self.active:
+            return
+        loud = (frame.speech and frame.prob >= self.min_prob
+                and frame.rms >= max(self.min_rms, frame.noise * self.snr))
+        self.run = self.run + 1 if loud else 0
+        if self.run < self.frames_needed:
+            return
+        self.active = False
+        self.triggered_at = time.monotonic()
+        self.playback.flush()
+        self.actuator.all_off()
+        self.onset = list(self.capture.ring)[-(self.run + self.preroll):]
+        self.capture.armed = True  # Everything after the onset queues up for the next recording
+        self.loop.call_soon_threadsafe(self._triggered)
+
+    def _triggered(self):
+        # Runs before any frame queued after the trigger, so only stale frames are dropped
+        while not self.capture.queue.empty():
+            self.capture.queue.get_nowait()
+        self.count += 1
+        self.event.set()
+
+    async def wait(self):
+        await self.event.wait()
+
+    # 🎞 Onset frames for the next recording (once)
+    def take(self):
+        onset, self.onset = self.onset, None
+        return onset
+
+# 🐟 Shared barge-in watcher
+barge_in = PerFish("barge_in", BargeIn)
 
 # 🎙 Record & Transcribe User Speech
-async def record_and_transcribe():
-    frames.clear()  # 🧽 Clean up old frames
-    audio = pyaudio.PyAudio()
-    stream = audio.open(format=format, channels=channels, rate=sample_rate, input=True,
-                        frames_per_buffer=int(sample_rate * chunk_duration_ms / 1000))
+# `preroll`: frames already spoken (barge-in onset); recording starts mid-utterance
+# `buffer`: the session's UtteranceBuffer, reused across turns (a fresh one if None)
+# `backlog`: keep frames queued before the call (armed during Billy's tail) as pre-roll only
+async def record_and_transcribe(recognizer=None, on_end_of_speech=None, preroll=None, buffer=None,
+                                backlog=False):
+    recognizer = recognizer or asr.recognizer
+    if buffer is None:
+        buffer = UtteranceBuffer()
+    buffer.reset()
+    incremental = IncrementalTranscriber(recognizer, buffer) if incremental_transcription else None
+    capture.arm(clear=not (preroll or backlog))  # 👂 Frames now flow into the queue from the audio thread
+    echo = capture.queue.qsize() if backlog and not preroll else 0  # Billy's own tail can't start a turn
 
     try:
         speaking = False
-        num_silent_chunks = 0
-        max_silent_chunks = int(silence_duration_ms / chunk_duration_ms)
+        endpointer = Endpointer()
+        cue = incremental.settled if incremental else None
+        pending = incremental.pending if incremental else None
+        if preroll:
+            speaking = True
+            tracer.mark("speech_onset")
+            for frame in preroll:
+                buffer.append(frame.pcm)
+                endpointer.update(frame)
+                if incremental:
+                    incremental.add(frame.speech)
 
+        tracer.mark("listening")
         print("🎤 Listening with VAD...")
         while True:
-            chunk = stream.read(int(sample_rate * chunk_duration_ms / 1000))
-            volume = audioop.rms(chunk, 2)
-            is_speech = vad.is_speech(chunk, sample_rate) and volume > threshold
+            frame = await capture.read()
+            chunk, is_speech = frame.pcm, frame.speech
 
             if speaking:
-                frames.append(chunk)
-                if not is_speech:
-                    num_silent_chunks += 1
-                    if num_silent_chunks > max_silent_chunks:
-                        break
-                else:
-                    num_silent_chunks = 0
+                room = buffer.append(chunk)
+                if incremental:
+                    incremental.add(is_speech)
+                if endpointer.update(frame, cue, pending):
+                    break
+                if not room:
+                    endpointer.reason = f"length cap {buffer.duration_ms / 1000:.0f} s"
+                    break
             else:
-                if is_speech:
+                if is_speech and echo <= 0:
                     speaking = True
-                    frames.append(chunk)
-
-        filename = "recording.wav"
-        with wave.open(filename, "wb") as wf:
-            wf.setnchannels(channels)
-            wf.setsampwidth(audio.get_sample_size(format))
-            wf.setframerate(sample_rate)
-            wf.writeframes(b''.join(frames))
+                    endpointer.update(frame)
+                    tracer.mark("speech_onset")
+                    buffer.start()  # ⏪ Pre-roll keeps the first syllable
+                    buffer.append(chunk)
+                    if incremental:
+                        incremental.add(is_speech)
+                else:
+                    buffer.listen(chunk)
+                echo -= 1
 
+        capture.disarm()
+        tracer.mark("end_of_speech")
+        print(f"⏹ End of turn after {endpointer.silence_ms} ms of silence ({endpointer.reason})")
+        if on_end_of_speech:
+            on_end_of_speech()
         print("📝 Transcribing...")
-        with open(filename, "rb") as f:
-            transcript = sclient.audio.transcriptions.create(model="whisper-1", file=f)
-
-        return transcript.text
+        if incremental:
+            text = await incremental.finish()
+        else:
+            text = await recognizer.transcribe(buffer.view())
+        tracer.mark("transcript_ready")
+        return text
     finally:
-        # Ensure proper cleanup
-        stream.stop_stream()
-        stream.close()
-        audio.terminate()
+        if incremental:
+            incremental.cancel()  # No-op once finished; stops uploads on timeout
+        # Keep the mic running for the next turn, just stop queueing frames
+        capture.disarm()
+        stats = capture.stats()
+        if stats["dropped"] or stats["overflowed"]:
+            print(f"⚠️ Capture dropped {stats['dropped']} / overflowed {stats['overflowed']} frames so far")
@@ -0,0 +1,76 @@
+# Per-recording utterance buffer
+# One preallocated bytearray with a hard length cap (memory stays flat however long people talk)
+# A rolling pre-roll window is kept before speech starts so the first syllable isn't clipped
+# view() hands out zero-copy memoryviews for encoding and upload
+
+from billy.config import sample_rate, chunk_duration_ms, preroll_ms, max_utterance_ms
+
+class UtteranceBuffer:
+    def __init__(self, rate=sample_rate, preroll_ms=preroll_ms, max_ms=max_utterance_ms,
+                 frame_ms=chunk_duration_ms):
+        self.bytes_per_ms = rate * 2 / 1000
+        self.frame_bytes = int(rate * frame_ms / 1000) * 2
+        self.capacity = self._bytes(max_ms)
+        self.data = bytearray(self.capacity)
+        self.preroll_bytes = max(2, min(self._bytes(preroll_ms), self.capacity))
+        self.preroll = bytearray(self.preroll_bytes)
+        self.reset()
+
+    def _bytes(self, ms):
+        return int(ms * self.bytes_per_ms) // 2 * 2
+
+    # 🧽 Ready for the next utterance (no reallocation)
+    def reset(self):
+        self.length = 0
+        self.preroll_pos = 0   # Next write position in the pre-roll ring
+        self.preroll_fill = 0  # Bytes of pre-roll collected so far
+        self.truncated = False
+
+    # ⏪ Before speech: remember only the last preroll_ms
+    def listen(self, pcm):
+        n = len(pcm)
+        if n >= self.preroll_bytes:
+            self.preroll[:] = pcm[n - self.preroll_bytes:]
+            self.preroll_pos = 0
+            self.preroll_fill = self.preroll_bytes
+            return
+        first = min(n, self.preroll_bytes - self.preroll_pos)
+        self.preroll[self.preroll_pos:self.preroll_pos + first] = pcm[:first]
+        self.preroll[:n - first] = pcm[first:]
+        self.preroll_pos = (self.preroll_pos + n) % self.preroll_bytes
+        self.preroll_fill = min(self.preroll_bytes, self.preroll_fill + n)
+
+    # 🗣 Speech onset: the pre-roll becomes the start of the utterance
+    def start(self):
+        start = (self.preroll_pos - self.preroll_fill) % self.preroll_bytes
+        head = min(self.preroll_fill, self.preroll_bytes - start)
+        self.data[:head] = self.preroll[start:start + head]
+        self.data[head:self.preroll_fill] = self.preroll[:self.preroll_fill - head]
+        self.length = self.preroll_fill
+        self.preroll_fill = 0
+        self.preroll_pos = 0
+
+    # 📥 Append speech; returns False once the cap is hit (the rest is dropped)
+    def append(self, pcm):
+        n = min(len(pcm), self.capacity - self.length)
+        self.data[self.length:self.length + n] = pcm[:n]
+        self.length += n
+        if n < len(pcm):
+            self.truncated = True
+        return not self.truncated
+
+    # ✂️ Drop the last `nbytes` (e.g. trailing endpoint silence)
+    def trim(self, nbytes):
+        self.length = max(0, self.length - nbytes)
+
+    # 🔍 Zero-copy slice for encoders / uploads
+    def view(self, start=0, end=None):
+        end = self.length if end is None else min(end, self.length)
+        return memoryview(self.data)[start:end].toreadonly()
+
+    def __len__(self):
+        return self.length
+
+    @property
+    def duration_ms(self):
+        return self.length / self.bytes_per_ms
@@ -0,0 +1,110 @@
+# PortAudio callback-mode microphone capture
+# Fixed 30 ms frames pushed from the audio thread into a ring buffer + asyncio queue
+# Dropped / overflowed frame metrics
+# Cards that can't do 16 kHz are resampled here, once, before framing (VAD + upload share the result)
+# Every frame carries its speech probability from billy.vad
+
+import asyncio
+import collections
+import threading
+import pyaudio
+from billy.config import chunk_duration_ms
+from billy.devices import devices as shared_devices
+from billy.resample import Resampler
+from billy.vad import detector as shared_detector
+from billy.perfish import PerFish
+
+class CaptureEngine:
+    def __init__(self, devices=shared_devices, detector=shared_detector, ring_ms=3000, queue_ms=3000):
+        self.devices = devices
+        self.detector = detector
+        self.frame_bytes = devices.frames_per_chunk * devices.sample_size
+        self.ring = collections.deque(maxlen=int(ring_ms / chunk_duration_ms))
+        self.queue_frames = int(queue_ms / chunk_duration_ms)
+        self.queue = None
+        self.loop = None
+        self.stream = None
+        self.resampler = None
+        self.armed = False
+        self.listeners = []  # Called on the audio thread with every Frame (barge-in)
+        self._partial = b""
+        self._lock = threading.Lock()
+
+        # 📊 Metrics
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.frames_overflowed = 0
+
+    # ▶️ Open the callback stream (call from inside the running event loop)
+    def start(self):
+        if self.stream is not None:
+            return
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=self.queue_frames)
+        self.stream = self.devices.open_input(self._callback)
+        resampler = Resampler(self.devices.input_device_rate, self.devices.input_rate)
+        self.resampler = None if resampler.passthrough else resampler
+        self.stream.start_stream()
+        print("🎙 Capture engine running.")
+
+    def stop(self):
+        self.armed = False
+        if self.stream is not None:
+            self.stream.stop_stream()
+            self.stream = None
+
+    # 🧵 Runs on the PortAudio thread — never touch asyncio objects directly here
+    def _callback(self, in_data, frame_count, time_info, status):
+        if status & pyaudio.paInputOverflow:
+            self.frames_overflowed += 1
+
+        with self._lock:
+            if self.resampler is not None:
+                in_data = self.resampler.process(in_data)
+            data = self._partial + in_data if self._partial else in_data
+            end = len(data) - len(data) % self.frame_bytes
+            self._partial = data[end:]
+            for frame in self.detector.process(data[:end]):
+                self.ring.append(frame)
+                self.frames_captured += 1
+                if self.armed:
+                    self.loop.call_soon_threadsafe(self._push, frame)
+                for listener in self.listeners:
+                    listener(frame)
+        return (None, pyaudio.paContinue)
+
+    # 📥 Queue full (reader fell behind): drop the oldest frame, the newest audio matters most
+    def _push(self, frame):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.frames_dropped += 1
+        self.queue.put_nowait(frame)
+
+    # 👂 Start/stop delivering frames to the queue (clear=False keeps frames already queued)
+    def arm(self, clear=True):
+        if self.stream is None:
+            self.start()
+        while clear and not self.queue.empty():
+            self.queue.get_nowait()
+        self.armed = True
+
+    def disarm(self):
+        self.armed = False
+
+    # 🎙 Next 30 ms billy.vad.Frame (awaitable, never blocks the loop)
+    async def read(self):
+        if not self.armed:
+            self.arm()
+        return await self.queue.get()
+
+    def stats(self):
+        return {
+            "captured": self.frames_captured,
+            "dropped": self.frames_dropped,
+            "overflowed": self.frames_overflowed,
+            "queued": self.queue.qsize() if self.queue else 0,
+            **self.detector.stats(),
+        }
+
+# 🐟 Shared instance
+capture = PerFish("capture", CaptureEngine)
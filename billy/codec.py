@@ -0,0 +1,80 @@
+# In-memory audio encoding for transcription uploads
+# WAV always works; FLAC via soundfile, FLAC/Opus via ffmpeg when installed
+# Nothing touches disk and nothing blocks the event loop
+
+import io
+import wave
+import asyncio
+import shutil
+from billy.config import sample_rate, channels
+
+try:
+    import numpy as np
+    import soundfile
+except ImportError:  # Optional: pip install soundfile
+    soundfile = None
+
+ffmpeg = shutil.which("ffmpeg")
+
+# ffmpeg output settings per codec: (container, extra args, upload filename)
+FFMPEG_CODECS = {
+    "flac": ("flac", ["-c:a", "flac"], "speech.flac"),
+    "opus": ("ogg", ["-c:a", "libopus", "-b:a", "24k", "-application", "voip"], "speech.ogg"),
+}
+
+_warned = set()
+
+def _as_bytes(pcm):
+    if isinstance(pcm, (bytes, bytearray, memoryview)):
+        return pcm
+    return b''.join(pcm)
+
+def pcm_length(pcm):
+    if isinstance(pcm, (bytes, bytearray, memoryview)):
+        return len(pcm)
+    return sum(map(len, pcm))
+
+# 📦 Raw 16-bit PCM (bytes or an iterable of chunks) -> (filename, encoded bytes)
+async def encode(pcm, codec="wav", rate=sample_rate):
+    if codec == "flac" and soundfile is not None:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _encode_soundfile, _as_bytes(pcm), rate)
+    if codec in FFMPEG_CODECS and ffmpeg:
+        return await _encode_ffmpeg(_as_bytes(pcm), codec, rate)
+    if codec != "wav" and codec not in _warned:
+        _warned.add(codec)
+        print(f"⚠️ No encoder for '{codec}', uploading WAV instead.")
+    return "speech.wav", encode_wav(pcm, rate)
+
+def encode_wav(pcm, rate=sample_rate):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        if isinstance(pcm, (bytes, bytearray, memoryview)):
+            wf.writeframesraw(pcm)
+        else:
+            for chunk in pcm:
+                wf.writeframesraw(chunk)
+    return buf.getvalue()
+
+def _encode_soundfile(pcm, rate):
+    buf = io.BytesIO()
+    samples = np.frombuffer(pcm, dtype=np.int16)
+    soundfile.write(buf, samples, rate, format="FLAC", subtype="PCM_16")
+    return "speech.flac", buf.getvalue()
+
+async def _encode_ffmpeg(pcm, codec, rate):
+    container, args, filename = FFMPEG_CODECS[codec]
+    proc = await asyncio.create_subprocess_exec(
+        ffmpeg, "-hide_banner", "-loglevel", "error",
+        "-f", "s16le", "-ar", str(rate), "-ac", str(channels), "-i", "pipe:0",
+        *args, "-f", container, "pipe:1",
+        stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE
+    )
+    data, _ = await proc.communicate(bytes(pcm))
+    if proc.returncode != 0:
+        print(f"⚠️ ffmpeg {codec} encode failed, uploading WAV instead.")
+        return "speech.wav", encode_wav(pcm, rate)
+    return filename, data
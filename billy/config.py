@@ -3,7 +3,6 @@
 # Global settings for audio & voice activity detection
 
 import os
-import collections
 import webrtcvad
 from dotenv import load_dotenv
 from openai import AsyncOpenAI, OpenAI
@@ -15,6 +14,7 @@ load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 VOICE_ID = os.getenv("ELEVENLABS_VOICE_ID", "n2bKrLSWHzSMKmSqczm1")
+ELEVENLABS_WS_BASE = os.getenv("ELEVENLABS_WS_BASE", "wss://api.elevenlabs.io")
 
 # 🤖 OpenAI Clients
 client = AsyncOpenAI(api_key=OPENAI_API_KEY)
@@ -24,11 +24,82 @@ sclient = OpenAI(api_key=OPENAI_API_KEY)
 format = 8  # Equivalent to pyaudio.paInt16
 sample_rate = 16000
 chunk_duration_ms = 30
-silence_duration_ms = 800
+silence_duration_ms = 800  # Longest trailing silence we wait for (billy.endpoint adapts below it)
 channels = 1
-frames = collections.deque()
-threshold = 1000
-vad = webrtcvad.Vad(1)
+preroll_ms = 300  # Audio kept from just before speech onset
+max_utterance_ms = 30000  # Hard cap per utterance (billy.buffer preallocates this much)
+vad_mode = 1
+vad = webrtcvad.Vad(vad_mode)
+
+# 🔈 Speech Detection (billy.vad): SNR over a running noise floor, combined with webrtcvad
+noise_floor_init = 300
+speech_snr_db = 6
+speech_threshold = 0.5
+
+# 📌 GPIO chip the pins in billy.hardware live on
+gpio_chip = int(os.getenv("BILLY_GPIO_CHIP", "0"))
+
+# 🐟 Fleet mode (fleet.py): per-fish pins + sound cards, see fleet.example.json
+fleet_config = os.getenv("BILLY_FLEET", "fleet.json")
+
+# 🎚 Sound card rate: "auto" negotiates (pipeline rate if supported, else the card's native rate)
+device_rate = os.getenv("BILLY_DEVICE_RATE", "auto")
+
+# ⚡ Barge-in: talking over Billy stops him and starts a new turn (speech must beat his echo)
+barge_in = os.getenv("BILLY_BARGE_IN", "1") == "1"
+barge_in_rms = 1500
+barge_in_ms = 90
+
+# ⏹ Endpointing: 0 = always wait silence_duration_ms (no cues) ... 3 = cut in as early as possible
+endpoint_aggressiveness = int(os.getenv("BILLY_ENDPOINT_AGGRESSIVENESS", "2"))
+
+# 🧠 Conversation Memory (billy.memory): prompt token budget, recent turns kept word for word
+history_budget_tokens = int(os.getenv("BILLY_HISTORY_TOKENS", "1500"))
+history_keep_turns = 4
+summary_max_words = 120
+
+# 📝 Incremental Transcription (upload finished phrases while the user keeps talking)
+incremental_transcription = os.getenv("BILLY_INCREMENTAL_TRANSCRIPTION", "1") == "1"
+segment_pause_ms = 240
+min_segment_ms = 1500
+
+# 🗣 Speech Recognition (billy.asr): "openai", "vosk", or a fallback chain like "openai,vosk"
+asr_backend = os.getenv("BILLY_ASR", "openai,vosk")
+asr_timeout_s = float(os.getenv("BILLY_ASR_TIMEOUT_S", "4"))  # Then the next backend in the chain
+vosk_model_path = os.getenv("BILLY_VOSK_MODEL", os.path.expanduser("~/.cache/billy/vosk-model-small-en-us-0.15"))
+
+# 📦 Upload codec for transcription: wav, flac or opus
+transcribe_codec = os.getenv("BILLY_TRANSCRIBE_CODEC", "flac")
+
+# 🗣 Text to Speech (billy.tts): "auto" = ElevenLabs, local Piper when offline or over budget;
+# "elevenlabs" or "piper" to force one
+tts_backend = os.getenv("BILLY_TTS", "auto")
+tts_latency_budget_ms = int(os.getenv("BILLY_TTS_BUDGET_MS", "700"))  # ElevenLabs first audio p50 above this -> local
+piper_voice_path = os.getenv("BILLY_PIPER_VOICE", os.path.expanduser("~/.cache/billy/piper/en_US-ryan-medium.onnx"))
+
+# 🖥 Local engine workers (Piper processes, Vosk decoder threads): raise for fleet mode
+local_workers = int(os.getenv("BILLY_LOCAL_WORKERS", "1"))
+
+# 🔊 Playback Settings (ElevenLabs pcm_22050)
+playback_rate = 22050
+playback_channels = 1
+
+# 🗃 Phrase Cache (synthesized catchphrases kept on disk)
+tts_cache_dir = os.getenv("BILLY_TTS_CACHE_DIR", os.path.expanduser("~/.cache/billy/tts"))
+tts_cache_max_mb = int(os.getenv("BILLY_TTS_CACHE_MAX_MB", "64"))
+
+# 💬 Reply Cache (billy.replies): frequent questions answered from stored text + audio
+reply_cache = os.getenv("BILLY_REPLY_CACHE", "1") == "1"
+reply_cache_dir = os.getenv("BILLY_REPLY_CACHE_DIR", os.path.expanduser("~/.cache/billy/replies"))
+reply_cache_max_mb = int(os.getenv("BILLY_REPLY_CACHE_MAX_MB", "64"))
+reply_cache_ttl_h = float(os.getenv("BILLY_REPLY_CACHE_TTL_H", "24"))  # Learned variants go stale
+reply_variants = 3  # Pool size per question, served in rotation
+
+# ⏱ Latency Traces (turns.jsonl + billy.prom)
+trace_dir = os.getenv("BILLY_TRACE_DIR", "traces")
+
+# 🤔 Filler Clips (pre-rendered pcm_22050 played while the reply is on its way)
+filler_dir = os.getenv("BILLY_FILLER_DIR", os.path.expanduser("~/.cache/billy/filler"))
 
 import os
 print("🔑 OPENAI Key starts with:", os.getenv("OPENAI_API_KEY", "Not loaded")[:10])
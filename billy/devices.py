@@ -0,0 +1,115 @@
+# One long-lived PyAudio instance shared by capture and playback
+# Input & output streams opened once at startup and kept warm across turns
+# The mic is driven by billy.capture in callback mode, the speaker by billy.playback
+# Streams run at the card's native rate when it can't do the pipeline rate (billy.resample converts)
+# Cards are the system defaults unless picked by index or name (fleet mode: one card per fish)
+
+import threading
+import pyaudio
+from billy.config import (
+    format, channels, sample_rate, chunk_duration_ms,
+    playback_rate, playback_channels, device_rate
+)
+from billy.perfish import PerFish
+
+class AudioDevices:
+    def __init__(self, input_rate=sample_rate, output_rate=playback_rate, input_device=None, output_device=None):
+        self.input_rate = input_rate    # What VAD + transcription want
+        self.output_rate = output_rate  # What TTS delivers
+        self.input_device = input_device    # PortAudio index or part of the card's name (None = default)
+        self.output_device = output_device
+        self.input_device_rate = None   # What the sound card actually runs (negotiated on open)
+        self.output_device_rate = None
+        self.frames_per_chunk = int(input_rate * chunk_duration_ms / 1000)
+        self.audio = None
+        self.input_stream = None
+        self.output_stream = None
+        self.output_latency = 0.0
+        self._lock = threading.Lock()
+
+    # 🔌 Open everything up front (call once at startup)
+    def start(self):
+        with self._lock:
+            if self.audio is None:
+                self.audio = pyaudio.PyAudio()
+            if self.output_stream is None:
+                self.output_device_rate = self._negotiate(self.output_rate, output=True)
+                self.output_stream = self.audio.open(
+                    format=pyaudio.paInt16, channels=playback_channels,
+                    rate=self.output_device_rate, output=True,
+                    output_device_index=self._index(output=True)
+                )
+                self.output_latency = self.output_stream.get_output_latency()
+        print(f"🎚 Audio devices ready (speaker {self.output_device_rate} Hz).")
+
+    # 🔎 The chosen card's PortAudio info
+    def _info(self, output):
+        wanted = self.output_device if output else self.input_device
+        if wanted is None:
+            if output:
+                return self.audio.get_default_output_device_info()
+            return self.audio.get_default_input_device_info()
+        channels_key = "maxOutputChannels" if output else "maxInputChannels"
+        for i in range(self.audio.get_device_count()):
+            info = self.audio.get_device_info_by_index(i)
+            if info.get(channels_key, 0) and (wanted == i or str(wanted) in info["name"]):
+                return info
+        raise IOError(f"No {'output' if output else 'input'} device matching {wanted!r}")
+
+    def _index(self, output):
+        if (self.output_device if output else self.input_device) is None:
+            return None  # PortAudio's default
+        return self._info(output)["index"]
+
+    # 🤝 Pipeline rate if the card takes it, else the card's default rate (BILLY_DEVICE_RATE overrides)
+    def _negotiate(self, rate, output):
+        if device_rate != "auto":
+            return int(device_rate)
+        info = self._info(output)
+        try:
+            if output:
+                self.audio.is_format_supported(rate, output_device=info["index"],
+                                               output_channels=playback_channels, output_format=format)
+            else:
+                self.audio.is_format_supported(rate, input_device=info["index"],
+                                               input_channels=channels, input_format=format)
+            return rate
+        except (ValueError, IOError):
+            native = int(info["defaultSampleRate"])
+            print(f"🔁 {'Speaker' if output else 'Mic'} can't do {rate} Hz, resampling from {native} Hz.")
+            return native
+
+    @property
+    def sample_size(self):
+        return pyaudio.get_sample_size(format)
+
+    # 🎙 Callback-mode mic stream (owned by billy.capture)
+    def open_input(self, stream_callback):
+        if self.audio is None:
+            self.start()
+        with self._lock:
+            if self.input_stream is None:
+                self.input_device_rate = self._negotiate(self.input_rate, output=False)
+                self.input_stream = self.audio.open(
+                    format=format, channels=channels, rate=self.input_device_rate, input=True,
+                    frames_per_buffer=int(self.input_device_rate * chunk_duration_ms / 1000), start=False,
+                    stream_callback=stream_callback, input_device_index=self._index(output=False)
+                )
+        return self.input_stream
+
+    # 🧹 Release everything on shutdown
+    def close(self):
+        with self._lock:
+            for stream in (self.input_stream, self.output_stream):
+                if stream is not None:
+                    stream.stop_stream()
+                    stream.close()
+            self.input_stream = None
+            self.output_stream = None
+            if self.audio is not None:
+                self.audio.terminate()
+                self.audio = None
+        print("🔌 Audio devices closed.")
+
+# 🐟 Shared instance used by billy.capture and billy.playback
+devices = PerFish("devices", AudioDevices)
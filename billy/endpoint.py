@@ -0,0 +1,97 @@
+# End-of-turn detection for record_and_transcribe
+# Trailing-silence window adapts per utterance: short after complete-sounding phrases,
+# longer after hesitations ("and...", "um..."), using the VAD frame stream (energy trend,
+# murmur in the pause) and finished partial transcripts when we have them
+
+import re
+import math
+import collections
+from billy.config import chunk_duration_ms, silence_duration_ms, endpoint_aggressiveness
+
+# Base window per aggressiveness level, as a fraction of silence_duration_ms
+# Level 0 is a fixed window (no cues), like the old silence counter
+LEVELS = (1.0, 0.75, 0.55, 0.4)
+
+# Words people trail off on when they're not done yet
+HESITATIONS = {
+    "um", "uh", "uhm", "erm", "hmm", "and", "but", "or", "so", "because", "cause", "like",
+    "the", "a", "an", "to", "of", "with", "for", "if", "that", "my", "your", "is", "was", "what",
+}
+SENTENCE_END = re.compile(r"[.?!][\"')\]]*$")
+
+class Endpointer:
+    def __init__(self, aggressiveness=endpoint_aggressiveness, frame_ms=chunk_duration_ms,
+                 max_ms=silence_duration_ms * 1.5, min_ms=180, short_ms=700):
+        self.level = max(0, min(len(LEVELS) - 1, int(aggressiveness)))
+        self.frame_ms = frame_ms
+        self.base_ms = silence_duration_ms * LEVELS[self.level]
+        self.max_ms = max_ms
+        self.min_ms = min_ms
+        self.short_ms = short_ms  # "Yes", "no", "hi Billy": nothing more is coming
+        self.hold_ms = min(max_ms, 2 * self.base_ms) if self.level else self.base_ms  # Longest wait for a transcript still uploading
+        self.reset()
+
+    def reset(self):
+        self.speech_ms = 0
+        self.silence_ms = 0
+        self.loudness = []        # dB of every speech frame this utterance
+        self.recent = collections.deque(maxlen=10)  # dB of the last 300 ms of speech
+        self.fade = 0.0           # How far the last phrase trailed off (0 = hard stop)
+        self.silent_prob = 0.0    # Smoothed speech probability during the current pause
+        self.window_ms = self.base_ms
+        self.reason = "base"
+
+    # 🧮 Feed one billy.vad.Frame; returns True once the turn is over
+    # `cue()` returns the finished transcript so far (None while unsettled),
+    # `pending()` says whether a transcript for the latest speech is still on its way
+    def update(self, frame, cue=None, pending=None):
+        if frame.speech:
+            db = 20 * math.log10(max(frame.rms, 1.0))
+            self.loudness.append(db)
+            self.recent.append(db)
+            self.speech_ms += self.frame_ms
+            self.silence_ms = 0
+            self.silent_prob = 0.0
+            return False
+        if self.silence_ms == 0 and self.recent:
+            # First silent frame: if the last syllables never got near the utterance's usual
+            # peaks, the phrase faded out (trailing off) rather than stopping
+            typical = sorted(self.loudness)[int(0.9 * (len(self.loudness) - 1))]
+            drop = typical - max(self.recent)
+            self.fade = max(0.0, min(1.0, (drop - 2) / 4))
+        self.silence_ms += self.frame_ms
+        self.silent_prob += 0.3 * (frame.prob - self.silent_prob)
+        text = cue() if cue else None
+        self.window_ms, self.reason = self._window(text)
+        if self.silence_ms < self.window_ms:
+            return False
+        if text is None and pending is not None and pending() and self.silence_ms < self.hold_ms:
+            self.reason = "waiting for transcript"
+            return False
+        return True
+
+    def _window(self, text):
+        if self.level == 0:
+            return self.base_ms, "fixed"
+        window = self.base_ms
+        reason = "base"
+        words = text.split() if text else []
+        if words:
+            last = words[-1].strip(",;:-").lower()
+            if SENTENCE_END.search(words[-1]):
+                window *= 0.6
+                reason = "sentence end"
+            elif words[-1].endswith((",", "-", "—")) or last in HESITATIONS:
+                window *= 2.0
+                reason = "hesitation"
+        if reason == "base":
+            if self.speech_ms <= self.short_ms:
+                window *= 0.75
+                reason = "short reply"
+            elif self.fade > 0.5:
+                window *= 1.6
+                reason = "trailing off"
+        if self.silent_prob > 0.3:
+            window *= 1.25  # Breath or murmur in the pause: they're probably about to go on
+            reason += " + murmur"
+        return max(self.min_ms, min(self.max_ms, window)), reason
@@ -0,0 +1,114 @@
+# Latency-masking filler clips ("Yah...", grunts) played the moment endpointing fires
+# Clips are pre-rendered pcm_22050 files on local storage
+# Hands off to the real reply as soon as its first audio chunk is ready
+
+import os
+import random
+import asyncio
+from contextlib import suppress
+import numpy as np
+from billy.config import filler_dir, playback_rate
+from billy.playback import playback as shared_playback
+from billy.actuator import actuator as shared_actuator
+from billy.lipsync import lipsync as shared_lipsync
+from billy.perfish import PerFish
+
+FILLER_PHRASES = ["Yah...", "Hmm, ja...", "Aaargh...", "Ohh, ja ja...", "Hah!"]
+
+class FillerPlayer:
+    def __init__(self, directory=filler_dir, playback=shared_playback, actuator=shared_actuator,
+                 lipsync=shared_lipsync, slice_ms=20, fade_ms=10):
+        self.playback = playback
+        self.actuator = actuator
+        self.lipsync = lipsync
+        self.slice_ms = slice_ms
+        self.slice_bytes = int(playback_rate * slice_ms / 1000) * 2
+        self.fade_samples = int(playback_rate * fade_ms / 1000)
+        self.clips = self._load(directory)
+        self.task = None
+        self._stop = asyncio.Event()
+        self._last = None
+
+    def _load(self, directory):
+        clips = []
+        if os.path.isdir(directory):
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(".pcm"):
+                    with open(os.path.join(directory, name), "rb") as f:
+                        clips.append(f.read())
+        if not clips:
+            print(f"ℹ️ No filler clips in {directory} (run: python -m billy.filler)")
+        return clips
+
+    # 🗣 End-of-speech: start a clip right away
+    def start(self):
+        if not self.clips or (self.task is not None and not self.task.done()):
+            return
+        choices = [c for c in self.clips if c is not self._last] or self.clips
+        self._last = random.choice(choices)
+        self._stop.clear()
+        self.task = asyncio.create_task(self._play(self._last))
+
+    async def _play(self, clip):
+        view = memoryview(clip)
+        self.actuator.tail(head=True)  # Head up, same pose the reply animation starts in
+        try:
+            for i in range(0, len(view), self.slice_bytes):
+                pcm = view[i:i + self.slice_bytes]
+                if self._stop.is_set():
+                    pcm = self._fade_out(pcm)
+                # Keep only a slice beyond the prebuffer queued, so a handoff cuts in quickly
+                await self.playback.wait_ahead(self.slice_ms)
+                self.lipsync.feed(pcm, self.playback.play_time())
+                await self.playback.write(pcm)
+                if self._stop.is_set():
+                    break
+        except BaseException:
+            self.playback.flush()
+            self.lipsync.reset()
+            raise
+        self.playback.end()
+        self.lipsync.finish(self.playback.play_time())
+
+    # 🔉 Short ramp so cutting a clip mid-word doesn't click
+    def _fade_out(self, pcm):
+        samples = np.frombuffer(pcm, dtype=np.int16)[:self.fade_samples].astype(np.float32)
+        samples *= np.linspace(1.0, 0.0, len(samples), dtype=np.float32)
+        return samples.astype(np.int16).tobytes()
+
+    # 🤝 Real audio is ready: let the clip finish its current slice and get out of the way
+    async def handoff(self):
+        if self.task is None:
+            return
+        self._stop.set()
+        with suppress(asyncio.CancelledError):
+            await self.task
+        self.task = None
+
+    def cancel(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+# 🎙 Render FILLER_PHRASES to local clips once (needs network)
+async def render_fillers(directory=filler_dir):
+    from billy.tts_pool import tts_pool
+    from billy.tts import audio_listener
+    import json
+
+    os.makedirs(directory, exist_ok=True)
+    for i, phrase in enumerate(FILLER_PHRASES):
+        ws = await tts_pool.acquire()
+        await ws.send(json.dumps({"text": phrase + " ", "try_trigger_generation": True}))
+        await ws.send(json.dumps({"text": ""}))
+        pcm = b"".join([chunk async for chunk in audio_listener(ws, [phrase])])
+        with open(os.path.join(directory, f"filler_{i:02d}.pcm"), "wb") as f:
+            f.write(pcm)
+        print(f"💾 {phrase!r}: {len(pcm)} bytes")
+    await tts_pool.close()
+
+# 🐟 Shared player
+filler = PerFish("filler", FillerPlayer)
+
+if __name__ == "__main__":
+    asyncio.run(render_fillers())
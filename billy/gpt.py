@@ -1,53 +1,182 @@
 # Sending the user prompt to GPT-4o-mini
 # Receiving and streaming back text responses
 # Chunking the text for smoother playback
+# Conversation history from billy.memory, token usage and time to first token per turn
 
+import re
+import time
+import asyncio
 from billy.config import client
+from billy.tracing import tracer
+from billy.memory import ConversationMemory
+from billy.perfish import PerFish
+
+# 🐟 Who Billy is. Never edited at runtime: every request opens with this exact prefix
+SYSTEM_PROMPT = (
+    "You are Sammy Salmon, voiced like Arnold Schwarzenegger. You only speak English, with a strong german accent. Use dramatic flair, exaggerated catchphrases, and classic "
+    "Arnold-inspired vocalizations such as 'Yah', 'Aaargh', 'Get to da choppah!', 'Hasta la vista, baby!', 'I'll be back!', "
+    "and 'It's not a tumor!' Speak in a comedic, over-the-top manner with Arnold's distinctive Austrian accent, deep voice, "
+    "powerful grunts, playful exaggeration, and humorous pauses. You're not just a fish—you're an action-hero fish, so deliver "
+    "every line as if you're starring in a blockbuster movie. Don't overdo the catchphrases, but sprinkle them in for comedic effect. "
+    "Use short, punchy sentences and a conversational tone. Be funny, macho, and full of action-hero spirit. "
+    "Use emojis to enhance the humor and drama. Use a friendly, approachable tone, and make sure to keep it light-hearted. "
+    "Be concise and to the point, but also engaging and entertaining. Use humor and wit to keep the conversation lively. "
+    "Be creative and imaginative, and don't be afraid to take risks with your responses. "
+    "and keep responses short unless longer replies are needed. Loud, funny, macho, and full of action hero spirit!"
+)
+
+# 🧠 This conversation so far (reset on each button press)
+memory = PerFish("memory", lambda: ConversationMemory(SYSTEM_PROMPT))  # One conversation per fish
+
+# 📡 An open reply stream plus what was asked
+class Reply:
+    def __init__(self, prompt, stream, prompt_chars, started):
+        self.prompt = prompt
+        self.stream = stream
+        self.prompt_chars = prompt_chars
+        self.started = started
+
+    async def close(self):
+        await self.stream.close()
 
 # 🧠 Ask Billy Something
 async def ask_billy(prompt):
+    return reply_text(await open_reply(prompt))
+
+# 📡 Start the request (returns once the response stream is open; billy.pipeline starts it early)
+async def open_reply(prompt):
+    messages = memory.messages(prompt)
+    started = time.monotonic()
     stream = await client.chat.completions.create(
         model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": (
-                "You are Sammy Salmon, voiced like Arnold Schwarzenegger. You only speak English, with a strong german accent. Use dramatic flair, exaggerated catchphrases, and classic "
-                "Arnold-inspired vocalizations such as 'Yah', 'Aaargh', 'Get to da choppah!', 'Hasta la vista, baby!', 'I'll be back!', "
-                "and 'It's not a tumor!' Speak in a comedic, over-the-top manner with Arnold's distinctive Austrian accent, deep voice, "
-                "powerful grunts, playful exaggeration, and humorous pauses. You're not just a fish—you're an action-hero fish, so deliver "
-                "every line as if you're starring in a blockbuster movie. Don't overdo the catchphrases, but sprinkle them in for comedic effect. "
-                "Use short, punchy sentences and a conversational tone. Be funny, macho, and full of action-hero spirit. "
-                "Use emojis to enhance the humor and drama. Use a friendly, approachable tone, and make sure to keep it light-hearted. "
-                "Be concise and to the point, but also engaging and entertaining. Use humor and wit to keep the conversation lively. "
-                "Be creative and imaginative, and don't be afraid to take risks with your responses. "
-                "and keep responses short unless longer replies are needed. Loud, funny, macho, and full of action hero spirit!"
-            )},
-            {"role": "user", "content": prompt}
-        ],
-        stream=True
+        messages=messages,
+        stream=True,
+        stream_options={"include_usage": True}  # Last chunk carries prompt/cached token counts
     )
+    return Reply(prompt, stream, sum(len(m["content"]) for m in messages), started)
 
-    async def text_gen():
-        async for part in stream:
+# 🪶 Text deltas from an open reply; the exchange goes into memory when it ends
+async def reply_text(reply):
+    parts = []
+    finished = False
+    try:
+        async for part in reply.stream:
+            if part.usage:
+                _report_usage(reply, part.usage)
+            if not part.choices:
+                continue  # Usage-only chunk
             delta = part.choices[0].delta
             if delta.content:
+                if not parts:
+                    tracer.mark("first_gpt_token")
+                    tracer.note("gpt_ttft_ms", round((time.monotonic() - reply.started) * 1000, 1))
                 print(f"🪶 GPT says: {delta.content}")
+                parts.append(delta.content)
                 yield delta.content
+        finished = True
+    finally:
+        await reply.close()  # Barge-in: stop paying for tokens nobody will hear
+        if parts:
+            memory.add(reply.prompt, "".join(parts) + ("" if finished else "..."))
+
+def _report_usage(reply, usage):
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = (getattr(details, "cached_tokens", None) or 0) if details else 0
+    memory.calibrate(reply.prompt_chars, usage.prompt_tokens)
+    tracer.note("prompt_tokens", usage.prompt_tokens)
+    tracer.note("cached_prompt_tokens", cached)
+    ttft = tracer.current["values"].get("gpt_ttft_ms", 0.0) if tracer.current else 0.0
+    print(f"🧮 Prompt: {usage.prompt_tokens} tokens ({cached} cached), first token after {ttft:.0f} ms")
+
+# 🍌 How GPT text is grouped into TTS messages
+class ChunkPolicy:
+    def __init__(self, first_min_chars=12, min_chars=40, growth=1.6, max_chars=220,
+                 first_deadline_ms=300, deadline_ms=700, flush_first=True):
+        self.first_min_chars = first_min_chars  # First chunk goes out early...
+        self.min_chars = min_chars              # ...later ones are clause/sentence sized
+        self.growth = growth                    # and grow each time, up to max_chars
+        self.max_chars = max_chars
+        self.first_deadline = first_deadline_ms / 1000
+        self.deadline = deadline_ms / 1000      # Flush whole words if GPT stalls this long
+        self.flush_first = flush_first          # Ask ElevenLabs to start on the first chunk right away
 
-    return text_gen()
+    def target(self, index):
+        if index == 0:
+            return self.first_min_chars
+        return min(self.max_chars, int(self.min_chars * self.growth ** (index - 1)))
 
-# 🍌 Split GPT response into playable chunks
-async def text_chunker(text_iterator):
-    splitters = (".", ",", "?", "!", ";", ":", "—", "-", "(", ")", "[", "]", "}", " ")
+chunk_policy = ChunkPolicy()
+
+SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*\s+")
+CLAUSE_END = re.compile(r"(?:[,;:]|\s[—–-])\s+")
+
+# ✂️ Where to cut the buffer for a chunk of at least `target` chars (None = keep waiting)
+def _cut_point(buffer, target, max_chars):
+    for m in SENTENCE_END.finditer(buffer):
+        if m.end() >= target:
+            return m.end()
+    for m in CLAUSE_END.finditer(buffer):
+        if m.end() >= target * 1.5:
+            return m.end()
+    if len(buffer) >= max_chars:
+        space = buffer.rfind(" ", 0, max_chars)
+        return space + 1 if space > 0 else max_chars
+    return None
+
+# 🍌 Split GPT response into playable chunks (clause/sentence sized, deadline-flushed)
+async def text_chunker(text_iterator, policy=None):
+    policy = policy or chunk_policy
+    queue = asyncio.Queue()
+
+    async def pump():
+        try:
+            async for text in text_iterator:
+                await queue.put(text)
+        finally:
+            await queue.put(None)
+
+    pump_task = asyncio.create_task(pump())
+    loop = asyncio.get_running_loop()
     buffer = ""
-    async for text in text_iterator:
-        if buffer.endswith(splitters):
-            yield buffer if buffer.endswith(" ") else buffer + " "
-            buffer = text
-        elif text.startswith(splitters):
-            output = buffer + text[0]
-            yield output if output.endswith(" ") else output + " "
-            buffer = text[1:]
-        else:
+    index = 0
+    started = None  # When the text in the buffer started arriving
+    try:
+        while True:
+            timeout = None
+            if buffer:
+                limit = policy.first_deadline if index == 0 else policy.deadline
+                timeout = max(0, started + limit - loop.time())
+            try:
+                text = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                # GPT stalled: send the complete words we have (a lone first word goes out whole,
+                # the buffer always ends on a finished token)
+                space = buffer.rfind(" ")
+                if space > 0:
+                    yield buffer[:space + 1]
+                    buffer = buffer[space + 1:]
+                    index += 1
+                elif buffer.strip():
+                    yield buffer
+                    buffer = ""
+                    index += 1
+                started = loop.time()
+                continue
+            if text is None:
+                break
+            if not buffer:
+                started = loop.time()
             buffer += text
-    if buffer != "":
-        yield buffer + " "
+            while True:
+                cut = _cut_point(buffer, policy.target(index), policy.max_chars)
+                if cut is None:
+                    break
+                yield buffer[:cut]
+                buffer = buffer[cut:]
+                index += 1
+                started = loop.time()
+        if buffer.strip():
+            yield buffer if buffer.endswith(" ") else buffer + " "
+        await pump_task  # Surface errors from the GPT stream
+    finally:
+        pump_task.cancel()
@@ -1,34 +1,108 @@
 import time
+import asyncio
 import lgpio as GPIO
+from billy.config import gpio_chip
+from billy.perfish import PerFish
 
 # 📌 GPIO Pin Assignments
-# 📌 GPIO Pin Assignments (matching your old working setup)
+# 📌 GPIO Pin Assignments (matching your old working setup; fleet.py maps its own per fish)
 BUTTON_PIN = 17
 MOUTH_PIN = 22
 TAIL_PIN = 23
 TAIL_PIN_2 = 24  # <- THIS was missing in the new version!
 
-# 🧠 Open GPIO chip
-h = GPIO.gpiochip_open(0)
-
-# 🧠 Setup GPIO pins
-GPIO.gpio_claim_output(h, MOUTH_PIN)
-GPIO.gpio_claim_output(h, TAIL_PIN)
-GPIO.gpio_claim_output(h, TAIL_PIN_2)
-GPIO.gpio_claim_input(h, BUTTON_PIN)
-
-# Set default states for outputs
-GPIO.gpio_write(h, MOUTH_PIN, 0)  # Mouth motor off
-GPIO.gpio_write(h, TAIL_PIN, 0)   # Tail motor off
-GPIO.gpio_write(h, TAIL_PIN_2, 0) # Tail motor off
-
-# 🎬 Button Press Waiter
-def wait_for_button():
-    print("🔧 Waiting for button press...")
-    while True:
-        if GPIO.gpio_read(h, BUTTON_PIN) == 0:
-            time.sleep(0.1)
-            if GPIO.gpio_read(h, BUTTON_PIN) == 0:
-                print("🎬 Button pressed!")
-                return
-        time.sleep(0.1)
+TAIL_GROUP_MASK = 0b11  # bit 0 = TAIL_PIN (head), bit 1 = TAIL_PIN_2 (tail)
+BUTTON_DEBOUNCE_US = 5000
+
+# 🧠 Open GPIO chips (one handle per chip, shared by every fish wired to it)
+_chips = {}  # chip number -> [handle, users]
+
+def _open_chip(chip):
+    if chip not in _chips:
+        _chips[chip] = [GPIO.gpiochip_open(chip), 0]
+    _chips[chip][1] += 1
+    return _chips[chip][0]
+
+def _close_chip(chip):
+    entry = _chips.get(chip)
+    if entry is None:
+        return
+    entry[1] -= 1
+    if entry[1] <= 0:
+        GPIO.gpiochip_close(entry[0])
+        del _chips[chip]
+
+# 🐟 One fish's pins
+class Hardware:
+    def __init__(self, chip=gpio_chip, button=BUTTON_PIN, mouth=MOUTH_PIN, tail=TAIL_PIN, tail_2=TAIL_PIN_2):
+        self.chip = chip
+        self.handle = _open_chip(chip)
+        self.button_pin = button
+        self.mouth_pin = mouth
+        self.tail_pin = tail
+
+        # 🧠 Setup GPIO pins
+        GPIO.gpio_claim_output(self.handle, mouth)
+        # Head/tail motor pair claimed as one group (tail leads) so both switch in a single write
+        GPIO.group_claim_output(self.handle, [tail, tail_2])
+        # Button is active-low: claim it for falling-edge alerts with a 5 ms debounce
+        GPIO.gpio_claim_alert(self.handle, button, GPIO.FALLING_EDGE)
+        GPIO.gpio_set_debounce_micros(self.handle, button, BUTTON_DEBOUNCE_US)
+
+        # Set default states for outputs
+        GPIO.gpio_write(self.handle, mouth, 0)  # Mouth motor off
+        GPIO.group_write(self.handle, tail, 0, TAIL_GROUP_MASK)  # Head & tail motors off
+
+    def close(self):
+        if self.handle is not None:
+            _close_chip(self.chip)
+            self.handle = None
+
+hardware = PerFish("hardware", Hardware)
+
+# 🎬 Edge-triggered button (lgpio alert thread -> asyncio event)
+class Button:
+    def __init__(self, hardware=hardware):
+        self.handle = hardware.handle
+        self.pin = hardware.button_pin
+        self.loop = None
+        self.event = None
+        self.cb = None
+        self.last_latency_ms = None
+        self.pressed_at = None  # time.monotonic() of the last press
+
+    # ▶️ Register the alert callback (call from inside the event loop)
+    def start(self):
+        if self.cb is not None:
+            return
+        self.loop = asyncio.get_running_loop()
+        self.event = asyncio.Event()
+        self.cb = GPIO.callback(self.handle, self.pin, GPIO.FALLING_EDGE, self._on_edge)
+
+    # 🧵 Runs on lgpio's alert thread; level 0 = pressed, 2 = watchdog
+    def _on_edge(self, chip, gpio, level, timestamp):
+        if level == 0:
+            self.loop.call_soon_threadsafe(self._pressed, timestamp)
+
+    def _pressed(self, timestamp):
+        self.pressed_at = time.monotonic()
+        self.last_latency_ms = (time.time_ns() - timestamp) / 1e6
+        self.event.set()
+
+    # ⏳ Wait for the next press without blocking the loop
+    async def wait(self):
+        self.start()
+        self.event.clear()
+        print("🔧 Waiting for button press...")
+        await self.event.wait()
+        print(f"🎬 Button pressed! ({self.last_latency_ms:.1f} ms after the edge)")
+
+    def stop(self):
+        if self.cb is not None:
+            self.cb.cancel()
+            self.cb = None
+
+button = PerFish("button", Button)
+
+async def button_pressed():
+    await button.wait()
@@ -0,0 +1,108 @@
+# Mouth sync driven by the audio itself
+# Vectorized RMS envelope per decoded PCM chunk -> open/close events
+# Events scheduled against the speaker's playback clock (billy.playback)
+# and handed to the billy.actuator thread
+
+import time
+import numpy as np
+from billy.config import playback_rate
+from billy.actuator import actuator as shared_actuator
+from billy.perfish import PerFish
+
+class LipSync:
+    def __init__(self, rate=playback_rate, window_ms=10, lead_ms=40,
+                 min_open_ms=60, min_closed_ms=40, floor=300.0,
+                 open_ratio=0.35, close_ratio=0.2, peak_decay=0.995, actuator=shared_actuator):
+        self.actuator = actuator
+        self.rate = rate
+        self.window = int(rate * window_ms / 1000)
+        self.lead = lead_ms / 1000  # Motor needs a head start to land on the syllable
+        self.min_open = int(min_open_ms / window_ms)
+        self.min_closed = int(min_closed_ms / window_ms)
+        self.floor = floor
+        self.open_ratio = open_ratio
+        self.close_ratio = close_ratio
+        self.peak_decay = peak_decay
+        self.reset_state()
+
+        # 📊 Metrics
+        self.chunks = 0
+        self.compute_ms_max = 0.0
+        self.compute_ms_total = 0.0
+
+    def reset_state(self):
+        self.carry = np.zeros(0, dtype=np.int16)
+        self.odd_byte = b""
+        self.peak = 0.0
+        self.is_open = False
+        self.held = 1 << 30  # Windows spent in the current state (first syllable opens at once)
+
+    # 📈 RMS per window (samples left over are carried into the next chunk)
+    def envelope(self, pcm):
+        if self.odd_byte or len(pcm) % 2:
+            pcm = self.odd_byte + bytes(pcm)
+            pcm, self.odd_byte = pcm[:len(pcm) - len(pcm) % 2], pcm[len(pcm) - len(pcm) % 2:]
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        if len(self.carry):
+            samples = np.concatenate((self.carry, samples))
+        usable = len(samples) - len(samples) % self.window
+        self.carry = samples[usable:].copy()
+        windows = samples[:usable].reshape(-1, self.window).astype(np.float32)
+        return np.sqrt(np.mean(windows * windows, axis=1))
+
+    # 👄 Envelope -> [(seconds from chunk start, open?)]
+    def events(self, pcm):
+        carried = len(self.carry)
+        rms = self.envelope(pcm)
+        if not len(rms):
+            return []
+
+        self.peak = max(float(rms.max()), self.peak * self.peak_decay ** len(rms))
+        open_at = max(self.floor, self.peak * self.open_ratio)
+        close_at = max(self.floor * 0.6, self.peak * self.close_ratio)
+
+        events = []
+        step = self.window / self.rate
+        offset = -carried / self.rate
+        for i, level in enumerate(rms.tolist()):
+            self.held += 1
+            if not self.is_open and level > open_at and self.held >= self.min_closed:
+                self.is_open, self.held = True, 0
+                events.append((offset + i * step, True))
+            elif self.is_open and level < close_at and self.held >= self.min_open:
+                self.is_open, self.held = False, 0
+                events.append((offset + i * step, False))
+        return events
+
+    # ⏱ Schedule a chunk's mouth moves for when it will actually be heard
+    def feed(self, pcm, start):
+        t0 = time.perf_counter()
+        events = self.events(pcm)
+        elapsed = (time.perf_counter() - t0) * 1000
+        self.chunks += 1
+        self.compute_ms_total += elapsed
+        self.compute_ms_max = max(self.compute_ms_max, elapsed)
+
+        for offset, state in events:
+            self.actuator.mouth(state, at=start + offset - self.lead)
+
+    # 🏁 Reply done: close the mouth once the last sample has been heard
+    def finish(self, end):
+        self.actuator.mouth(False, at=end)
+        self.reset_state()
+
+    # 🛑 Drop pending moves and shut the mouth now
+    def reset(self):
+        self.actuator.clear("mouth")
+        self.actuator.mouth(False)
+        self.reset_state()
+
+    def stats(self):
+        return {
+            "chunks": self.chunks,
+            "compute_ms_avg": self.compute_ms_total / self.chunks if self.chunks else 0.0,
+            "compute_ms_max": self.compute_ms_max,
+        }
+
+# 🐟 Shared instance
+lipsync = PerFish("lipsync", LipSync)
@@ -0,0 +1,129 @@
+# Conversation memory for billy.gpt
+# Recent turns kept word for word, older ones folded into a short running summary
+# (in the background, after the reply) so prompts stay under a token budget
+# The system prompt is always the first message, byte for byte; the summary follows it as an
+# ordinary exchange, so a compaction only changes what comes after the fixed prefix
+# (OpenAI only caches prompts past 1024 tokens: at Billy's size cached_prompt_tokens stays 0)
+
+import asyncio
+from billy.config import client, history_budget_tokens, history_keep_turns, summary_max_words
+
+SUMMARY_PROMPT = (
+    "Summarize the conversation below between a user and Billy, a talking fish, in at most {words} words. "
+    "Keep names, facts about the user, promises and open questions. Plain text, no emojis."
+)
+
+class ConversationMemory:
+    def __init__(self, system_prompt, budget_tokens=history_budget_tokens, keep_turns=history_keep_turns,
+                 summary_words=summary_max_words, compact_at=0.75, model="gpt-4o-mini"):
+        self.system = {"role": "system", "content": system_prompt}
+        self.budget = budget_tokens
+        self.keep_turns = keep_turns      # Never summarized away
+        self.summary_words = summary_words
+        self.compact_at = compact_at      # Start summarizing at this share of the budget
+        self.model = model
+        self.chars_per_token = 4.0        # Calibrated from the API's usage counts
+        self.compacting = None
+        self.epoch = 0
+        self.reset()
+
+        # 📊 Metrics
+        self.compactions = 0
+        self.truncations = 0
+
+    # 🧽 New conversation (button press)
+    def reset(self):
+        if self.compacting is not None:
+            self.compacting.cancel()
+            self.compacting = None
+        self.summary = ""
+        self.turns = []  # (user, billy)
+        self.epoch += 1  # Bumped per conversation
+        self.removed = 0  # Turns dropped from the front so far (truncated or summarized)
+
+    def _tokens(self, text):
+        return len(text) / self.chars_per_token + 4  # + per-message overhead
+
+    def _size(self, turns, prompt):
+        size = self._tokens(self.system["content"]) + self._tokens(prompt)
+        if self.summary:
+            size += self._tokens(self.summary) + self._tokens("Yah, I remember.")
+        return size + sum(self._tokens(user) + self._tokens(billy) for user, billy in turns)
+
+    # 📜 Messages for the next request
+    def messages(self, prompt):
+        while self.turns and self._size(self.turns, prompt) > self.budget:
+            del self.turns[0]  # Summary still on its way (or one huge turn): oldest goes first
+            self.removed += 1
+            self.truncations += 1
+        messages = [self.system]
+        if self.summary:
+            messages.append({"role": "user", "content": f"(Earlier in this conversation: {self.summary})"})
+            messages.append({"role": "assistant", "content": "Yah, I remember."})
+        for user, billy in self.turns:
+            messages.append({"role": "user", "content": user})
+            messages.append({"role": "assistant", "content": billy})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    # 📝 Remember a finished (or interrupted) exchange
+    def add(self, prompt, reply):
+        self.turns.append((prompt, reply))
+        if (self.compacting is None and len(self.turns) > self.keep_turns
+                and self._size(self.turns, "") > self.budget * self.compact_at):
+            self.compacting = asyncio.create_task(self._compact())
+
+    # 📏 The API's prompt_tokens for a request of `chars` characters
+    def calibrate(self, chars, prompt_tokens):
+        if prompt_tokens:
+            self.chars_per_token += 0.3 * (chars / prompt_tokens - self.chars_per_token)
+
+    # 🗜 Fold everything but the last keep_turns into the summary
+    async def _compact(self):
+        old = self.turns[:-self.keep_turns]
+        epoch, removed = self.epoch, self.removed
+        try:
+            summary = await self._summarize(old)
+        except Exception as e:
+            print(f"⚠️ Summary failed, dropping the oldest turns instead: {e}")
+            summary = self.summary
+        finally:
+            self.compacting = None
+        if self.epoch == epoch:  # Not reset meanwhile
+            left = max(0, len(old) - (self.removed - removed))  # Some may have been truncated already
+            self.summary = summary
+            del self.turns[:left]
+            self.removed += left
+            self.compactions += 1
+            print(f"🗜 Memory: {len(old)} turns summarized ({len(old) - left} already truncated), {len(self.turns)} kept word for word")
+
+    async def _summarize(self, turns):
+        lines = [f"Summary so far: {self.summary}"] if self.summary else []
+        for user, billy in turns:
+            lines.append(f"User: {user}")
+            lines.append(f"Billy: {billy}")
+        stream = await client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT.format(words=self.summary_words)},
+                {"role": "user", "content": "\n".join(lines)},
+            ],
+            stream=True
+        )
+        parts = []
+        try:
+            async for part in stream:
+                if part.choices and part.choices[0].delta.content:
+                    parts.append(part.choices[0].delta.content)
+        finally:
+            await stream.close()
+        return "".join(parts).strip()
+
+    def stats(self):
+        return {
+            "turns": len(self.turns),
+            "summary_chars": len(self.summary),
+            "compactions": self.compactions,
+            "truncations": self.truncations,
+            "chars_per_token": round(self.chars_per_token, 2),
+        }
@@ -0,0 +1,43 @@
+# Per-fish instances for fleet mode (fleet.py drives several fish from one process)
+# Shared module instances that belong to one animatronic (pins, motors, sound card, capture,
+# playback, tracer, memory...) are PerFish proxies: inside a fish's task they resolve to that
+# fish's own instance, anywhere else to the single-fish default (built on first use)
+# Threads don't inherit the task context: code on audio/GPIO threads is handed real instances
+# Shared proxies are the process-wide services (caches, recognizer): one instance, also built on
+# first use, so importing billy touches no files and starts no threads
+
+import contextvars
+
+current = contextvars.ContextVar("billy_fish", default=None)  # The running fish (None = single fish)
+
+class PerFish:
+    def __init__(self, name, factory):
+        object.__setattr__(self, "_perfish_name", name)
+        object.__setattr__(self, "_perfish_factory", factory)
+        object.__setattr__(self, "_perfish_default", None)
+
+    def _perfish_target(self):
+        fish = current.get()
+        if fish is not None:
+            return fish.parts[self._perfish_name]
+        if self._perfish_default is None:
+            object.__setattr__(self, "_perfish_default", self._perfish_factory())
+        return self._perfish_default
+
+    def __getattr__(self, name):
+        return getattr(self._perfish_target(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._perfish_target(), name, value)
+
+    def __repr__(self):
+        return f"<per-fish {self._perfish_name}: {self._perfish_target()!r}>"
+
+class Shared(PerFish):
+    def _perfish_target(self):
+        if self._perfish_default is None:
+            object.__setattr__(self, "_perfish_default", self._perfish_factory())
+        return self._perfish_default
+
+    def __repr__(self):
+        return f"<shared {self._perfish_name}: {self._perfish_target()!r}>"
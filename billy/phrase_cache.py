@@ -0,0 +1,118 @@
+# Content-addressed cache of synthesized phrases (pcm_22050)
+# Keyed by voice, model, voice settings and normalized text
+# Memory-mapped files on disk, LRU eviction under a size cap, hit/miss stats
+
+import os
+import re
+import json
+import mmap
+import hashlib
+import unicodedata
+import collections
+from billy.config import VOICE_ID, tts_cache_dir, tts_cache_max_mb
+from billy.tts_pool import MODEL_ID, OUTPUT_FORMAT, VOICE_SETTINGS
+from billy.perfish import Shared
+
+# 🧽 "  I’ll be BACK! " -> "i'll be back!"
+def normalize(text):
+    text = unicodedata.normalize("NFKC", text)
+    text = text.replace("’", "'").replace("‘", "'").replace("“", '"').replace("”", '"')
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+class PhraseCache:
+    def __init__(self, directory=tts_cache_dir, max_bytes=tts_cache_max_mb * 1024 * 1024,
+                 voice_id=VOICE_ID, model_id=MODEL_ID, voice_settings=VOICE_SETTINGS,
+                 output_format=OUTPUT_FORMAT, max_text_chars=160):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_text_chars = max_text_chars
+        self.voice = json.dumps({
+            "voice": voice_id, "model": model_id,
+            "settings": voice_settings, "format": output_format
+        }, sort_keys=True)
+        self.index = collections.OrderedDict()  # key -> size, oldest first
+        self.total_bytes = 0
+
+        # 📊 Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".pcm"):
+                st = os.stat(os.path.join(self.directory, name))
+                entries.append((st.st_mtime, name[:-4], st.st_size))
+        for _, key, size in sorted(entries):
+            self.index[key] = size
+            self.total_bytes += size
+
+    def key(self, text):
+        return hashlib.sha256(f"{self.voice}\n{normalize(text)}".encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".pcm")
+
+    # 🔎 Cached PCM as a read-only memory map, or None
+    def get(self, text):
+        key = self.key(text)
+        if key not in self.index:
+            self.misses += 1
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            os.utime(path)  # Keep LRU order across restarts
+        except (OSError, ValueError):
+            self._forget(key)
+            self.misses += 1
+            return None
+        self.index.move_to_end(key)
+        self.hits += 1
+        return data
+
+    # 💾 Store freshly synthesized PCM
+    def put(self, text, pcm):
+        if not pcm or len(normalize(text)) > self.max_text_chars or len(pcm) > self.max_bytes:
+            return
+        key = self.key(text)
+        path = self._path(key)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(pcm)
+        os.replace(tmp, path)
+        self.total_bytes += len(pcm) - self.index.pop(key, 0)
+        self.index[key] = len(pcm)
+        self._evict()
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self.index:
+            key = next(iter(self.index))
+            self._forget(key)
+            self.evictions += 1
+
+    def _forget(self, key):
+        self.total_bytes -= self.index.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.index),
+            "bytes": self.total_bytes,
+            "evictions": self.evictions,
+        }
+
+# 🐟 Shared cache (directory created on first use)
+phrase_cache = Shared("phrase_cache", PhraseCache)
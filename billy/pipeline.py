@@ -0,0 +1,108 @@
+# Pipelined conversation: neighbouring turn stages overlap instead of running back to back
+# GPT is asked the moment the transcript is in; TTS + animation set up while it thinks
+# The next listen is armed while the reply's tail is still playing (its frames only feed pre-roll)
+# Barge-in, timeouts and errors cancel and close whatever is still in flight
+
+import asyncio
+from contextlib import suppress
+from billy.config import preroll_ms
+from billy.audio import record_and_transcribe, barge_in
+from billy.capture import capture
+from billy.playback import playback
+from billy.gpt import open_reply, reply_text
+from billy.replies import replies
+from billy.tts_pool import tts_pool
+from billy.filler import filler
+from billy.tracing import tracer
+from billy.buffer import UtteranceBuffer
+
+# 🧠 Reply text for speak(): the GPT request is already in flight, we just wait for its stream
+async def _reply_text(request):
+    text_gen = reply_text(await request)
+    try:
+        async for text in text_gen:
+            yield text
+    finally:
+        await text_gen.aclose()  # Closes the OpenAI stream if the reply was cut short
+
+async def _cancel(task):
+    if task is not None and not task.done():
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+# 🗑 Drop a GPT request nobody will read (its stream may already be open)
+async def _close_request(task):
+    await _cancel(task)
+    if task is not None and not task.cancelled() and task.exception() is None:
+        await task.result().close()
+
+class Conversation:
+    def __init__(self, buffer=None, listen_timeout=20, arm_ms=preroll_ms, on_turn=None):
+        self.buffer = buffer or UtteranceBuffer()  # 🎞 Reused every turn
+        self.listen_timeout = listen_timeout
+        self.arm_ms = arm_ms  # Arm the next listen when this much of the reply is left
+        self.on_turn = on_turn  # Called with each finished turn's trace record
+
+    # 👂 Listen for the next prompt; with a gate, frames queue during Billy's tail and the
+    # recording proper (and its timeout) starts once the gate opens
+    async def _listen(self, gate=None):
+        if gate is not None:
+            await playback.wait_left(self.arm_ms)
+            capture.arm(clear=barge_in.onset is None)  # Keep what the user said over Billy
+            await gate.wait()
+        return await asyncio.wait_for(
+            record_and_transcribe(
+                on_end_of_speech=filler.start,  # 🤔 "Yah..." while we think
+                preroll=barge_in.take(),  # ⚡ Interrupted last reply? Those words are already heard
+                buffer=self.buffer,
+                backlog=gate is not None,
+            ),
+            timeout=self.listen_timeout
+        )
+
+    # 🔁 Turns until nobody talks for listen_timeout (raises asyncio.TimeoutError) or max_turns
+    async def run(self, pressed_at=None, max_turns=None):
+        tracer.begin()
+        if pressed_at is not None:
+            tracer.mark("button_press", at=pressed_at)
+        tts_pool.prewarm()  # Next reply's socket connects while we listen/transcribe
+        listening = asyncio.create_task(self._listen())
+        request = reply = queued_wait = None
+        turns = 0
+        try:
+            while True:
+                prompt = await listening
+                listening = None
+                print(f"🧠 GPT prompt: {prompt}")
+                queued = asyncio.Event()
+                hit = replies.lookup(prompt)
+                if hit is not None:
+                    request = None  # 💬 Asked a hundred times today: no GPT, no TTS
+                    reply = asyncio.create_task(replies.play(prompt, hit, on_queued=queued.set))
+                else:
+                    request = asyncio.create_task(open_reply(prompt))  # 🚀 In flight before anything else
+                    tts_pool.prewarm()
+                    reply = asyncio.create_task(
+                        replies.speak(prompt, _reply_text(request), on_queued=queued.set))
+                queued_wait = asyncio.create_task(queued.wait())
+                await asyncio.wait({reply, queued_wait}, return_when=asyncio.FIRST_COMPLETED)
+                turns += 1
+
+                # 👂 Reply fully queued (or over): set up the next listen behind a gate
+                gate = asyncio.Event()
+                if max_turns is None or turns < max_turns:
+                    listening = asyncio.create_task(self._listen(gate))
+                await reply
+                record = tracer.end()
+                if self.on_turn:
+                    self.on_turn(record)
+                if listening is None:
+                    return turns
+                tracer.begin()
+                tracer.follow_on()
+                gate.set()  # 🎤 Billy is quiet: speech from here on starts a turn
+        finally:
+            for task in (queued_wait, reply, listening):
+                await _cancel(task)
+            await _close_request(request)
@@ -0,0 +1,207 @@
+# Local neural TTS (Piper) for billy.tts: CPU only, keeps Billy talking without a network
+# The voice lives in worker processes (billy.piper_worker), loaded once and kept resident,
+# so synthesis never fights the event loop or the audio threads for the GIL
+# BILLY_LOCAL_WORKERS > 1 (fleet mode) spreads concurrent replies over several workers
+# Each chunk from billy.gpt.text_chunker is one job; pcm_22050 streams back sentence by sentence
+# Voices: https://github.com/rhasspy/piper (pip install piper-tts; .onnx next to its .onnx.json)
+# BILLY_PIPER_VOICE=tone runs a synthetic stand-in voice (benchmarks without a model)
+
+import os
+import asyncio
+import itertools
+import threading
+import multiprocessing
+from contextlib import suppress
+from billy.config import piper_voice_path, playback_rate, local_workers
+from billy.tracing import tracer
+from billy import piper_worker
+
+try:
+    import piper
+except ImportError:
+    piper = None
+
+# 🗣 One reply's worth of jobs
+class PiperSession:
+    def __init__(self, engine, sid, worker):
+        self.engine = engine
+        self.sid = sid
+        self.worker = worker
+        self.queue = asyncio.Queue()  # pcm, None (job done) or b"" (wake-up)
+        self.sent = 0
+        self.finished = False
+
+    async def send(self, text):
+        self.sent += 1
+        self.engine.submit(self, text)
+
+    # No more text: audio() ends once every job is back
+    async def finish(self):
+        self.finished = True
+        self.queue.put_nowait(b"")
+
+    async def audio(self):
+        done = 0
+        try:
+            while not (self.finished and done >= self.sent):
+                pcm = await self.queue.get()
+                if pcm is None:
+                    done += 1
+                elif pcm:
+                    tracer.mark("first_audio_chunk")
+                    yield pcm
+        finally:
+            self.engine.release(self.sid)
+
+    async def close(self):
+        self.engine.release(self.sid)
+
+# 🧵 One worker process and its pipe
+class PiperWorker:
+    def __init__(self, index):
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.ready = None
+        self.sessions = 0  # Open sessions it serves
+        self.lock = threading.Lock()
+
+    @property
+    def alive(self):
+        return self.conn is not None
+
+    def send(self, message):
+        with self.lock:
+            self.conn.send(message)
+
+class PiperEngine:
+    name = "piper"
+    caches = False  # Phrase cache holds the ElevenLabs voice only
+
+    def __init__(self, voice_path=piper_voice_path, rate=playback_rate, workers=local_workers, load_timeout=30):
+        self.voice_path = voice_path
+        self.rate = rate
+        self.load_timeout = load_timeout
+        self.workers = [PiperWorker(i) for i in range(max(1, workers))]  # Replies spread over these
+        self.loop = None
+        self.voice_rate = None
+        self.sessions = {}  # sid -> PiperSession
+        self.ids = itertools.count()
+
+        # 📊 Metrics
+        self.jobs = 0
+        self.cancelled = 0
+        self.crashes = 0
+
+    def available(self):
+        return self.voice_path == "tone" or (piper is not None and os.path.exists(self.voice_path))
+
+    # 🚀 Spawn the workers and start loading the voice (call from the event loop)
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        started = 0
+        for worker in self.workers:
+            if worker.process is None:
+                self._spawn(worker)
+                started += 1
+        if started:
+            print(f"🗣 Piper loading {os.path.basename(self.voice_path)} in {started} worker(s)")
+
+    def _spawn(self, worker):
+        worker.ready = asyncio.Event()
+        ctx = multiprocessing.get_context("spawn")  # Never fork the audio threads
+        worker.conn, child = ctx.Pipe()
+        worker.process = ctx.Process(target=piper_worker.run, args=(child, self.voice_path, self.rate),
+                                     name=f"piper-{worker.index}", daemon=True)
+        worker.process.start()
+        child.close()
+        threading.Thread(target=self._read, args=(worker, worker.conn), daemon=True).start()
+
+    # 📥 Worker -> event loop (blocking recv on its own thread)
+    def _read(self, worker, conn):
+        try:
+            while True:
+                sid, pcm = conn.recv()
+                self.loop.call_soon_threadsafe(self._deliver, worker, sid, pcm)
+        except (EOFError, OSError):
+            with suppress(RuntimeError):  # Loop already closed on shutdown
+                self.loop.call_soon_threadsafe(self._died, worker, conn)
+
+    def _deliver(self, worker, sid, pcm):
+        if sid == "ready":
+            self.voice_rate = pcm
+            worker.ready.set()
+            print(f"✅ Piper worker {worker.index} ready ({pcm} Hz voice)")
+            return
+        session = self.sessions.get(sid)
+        if session is not None:
+            session.queue.put_nowait(pcm)
+
+    def _died(self, worker, conn):
+        if conn is not worker.conn:
+            return  # An old worker we stopped on purpose
+        print(f"⚠️ Piper worker {worker.index} exited")
+        self.crashes += 1
+        worker.process = None
+        worker.conn = None
+        for sid, session in list(self.sessions.items()):
+            if session.worker is worker:
+                session.finished = True
+                session.sent = 0
+                session.queue.put_nowait(b"")
+                del self.sessions[sid]
+        worker.sessions = 0
+        worker.ready.set()  # open() stops waiting for a voice that never loaded
+
+    # 🎟 A session on the least busy worker
+    async def open(self):
+        self.start()
+        worker = min(self.workers, key=lambda w: w.sessions)
+        await asyncio.wait_for(worker.ready.wait(), self.load_timeout)
+        if not worker.alive:
+            raise RuntimeError("Piper worker is not running")
+        session = PiperSession(self, next(self.ids), worker)
+        worker.sessions += 1
+        self.sessions[session.sid] = session
+        return session
+
+    def submit(self, session, text):
+        if not session.worker.alive:
+            raise RuntimeError("Piper worker is not running")
+        self.jobs += 1
+        session.worker.send((session.sid, text))
+
+    # 🗑 Session over: drop whatever it still has queued in the worker
+    def release(self, sid):
+        session = self.sessions.pop(sid, None)
+        if session is None:
+            return
+        session.worker.sessions -= 1
+        if not session.worker.alive:
+            return
+        if not (session.finished and session.queue.empty()):
+            self.cancelled += 1
+        session.worker.send(("cancel", sid))
+
+    def stop(self):
+        for worker in self.workers:
+            if worker.process is None:
+                continue
+            conn, process = worker.conn, worker.process
+            worker.conn = worker.process = None
+            try:
+                with worker.lock:
+                    conn.send(None)
+            except OSError:
+                pass
+            process.join(2)
+            if process.is_alive():
+                process.terminate()
+            conn.close()
+
+    def stats(self):
+        return {"workers": len(self.workers), "jobs": self.jobs, "cancelled": self.cancelled,
+                "crashes": self.crashes}
+
+# 🐟 Shared engine
+piper_engine = PiperEngine()
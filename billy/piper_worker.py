@@ -0,0 +1,69 @@
+# Worker process for billy.piper_tts
+# Spawned, so the child re-imports the parent's __main__ (main.py, fleet.py or a bench) and with
+# it billy.config and friends: the OpenAI client object is built and PyAudio/lgpio are imported,
+# but nothing connects, opens a device or starts a thread (per-fish parts, caches and the
+# recognizer are built on first use); this module itself only needs numpy and piper
+# Loads the voice once, then synthesizes text jobs in order, one message per sentence
+# In:  (session, text) | ("cancel", session) | None to exit
+# Out: ("ready", voice rate) once, then (session, pcm) ... (session, None) after each job
+
+import time
+import collections
+import numpy as np
+from billy.resample import Resampler
+
+# 🧪 Offline stand-in voice ("tone"): babble at speech-like length and synthesis speed
+class ToneVoice:
+    class config:
+        sample_rate = 22050
+
+    def __init__(self, seconds_per_char=0.06, realtime_factor=0.15):
+        self.seconds_per_char = seconds_per_char
+        self.realtime_factor = realtime_factor  # Synthesis time / audio time
+
+    def synthesize_stream_raw(self, text):
+        for sentence in filter(None, (s.strip() for s in text.replace("!", ".").replace("?", ".").split("."))):
+            seconds = len(sentence) * self.seconds_per_char
+            time.sleep(seconds * self.realtime_factor)
+            t = np.arange(int(seconds * self.config.sample_rate)) / self.config.sample_rate
+            voice = np.sin(2 * np.pi * 140 * t) * (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t))
+            yield (voice * 8000).astype(np.int16).tobytes()
+
+def load_voice(path):
+    if path == "tone":
+        return ToneVoice()
+    from piper import PiperVoice
+    return PiperVoice.load(path)
+
+# 🗣 Raw int16 per sentence (piper-tts 1.2 and 1.3+ APIs)
+def sentences(voice, text):
+    if hasattr(voice, "synthesize_stream_raw"):
+        yield from voice.synthesize_stream_raw(text)
+    else:
+        for chunk in voice.synthesize(text):
+            yield chunk.audio_int16_bytes
+
+def run(conn, voice_path, out_rate):
+    voice = load_voice(voice_path)
+    rate = voice.config.sample_rate
+    resampler = Resampler(rate, out_rate)
+    conn.send(("ready", rate))
+    jobs = collections.deque()
+    current = None
+    while True:
+        # Take everything waiting (cancels drop queued jobs before we spend CPU on them)
+        while not jobs or conn.poll():
+            msg = conn.recv()
+            if msg is None:
+                return
+            if msg[0] == "cancel":
+                jobs = collections.deque(job for job in jobs if job[0] != msg[1])
+                continue
+            jobs.append(msg)
+        session, text = jobs.popleft()
+        if session != current:
+            resampler.reset()  # Filter state only carries over within one reply
+            current = session
+        for pcm in sentences(voice, text):
+            conn.send((session, resampler.process(pcm)))
+        conn.send((session, None))
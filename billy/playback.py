@@ -0,0 +1,222 @@
+# Speaker output through a preallocated ring buffer
+# One dedicated writer thread drains the ring into PortAudio in small blocking writes
+# Adaptive prebuffer: grows after an underrun, decays again after clean replies
+# TTS audio is resampled to the card's rate on the way in (lip-sync still sees the TTS rate)
+
+import time
+import asyncio
+import threading
+from billy.config import playback_channels
+from billy.devices import devices as shared_devices
+from billy.resample import Resampler
+from billy.perfish import PerFish
+
+class PlaybackEngine:
+    def __init__(self, devices=shared_devices, capacity_s=4.0, write_ms=20,
+                 prebuffer_ms=60, min_prebuffer_ms=40, max_prebuffer_ms=400):
+        self.devices = devices
+        self.frame = 2 * playback_channels
+        self.capacity_s = capacity_s
+        self.write_ms = write_ms
+        self.prebuffer_ms = prebuffer_ms
+        self.min_prebuffer_ms = min_prebuffer_ms
+        self.max_prebuffer_ms = max_prebuffer_ms
+        self.resampler = None
+        self.bytes_per_second = devices.output_rate * self.frame
+        self.ring = None  # Sized in start(), once the card's rate is known
+
+        self.head = 0       # Next byte the writer thread hands to PortAudio
+        self.size = 0       # Bytes queued in the ring
+        self.inflight = 0   # Bytes inside the current blocking write
+        self.playing = False
+        self.draining = False  # End of reply: play out whatever is left without prebuffering
+        self.dry_at = 0.0      # When the device runs dry if nothing more arrives (0 = not starved)
+        self.drained_at = 0.0  # When the last queued block was handed to PortAudio
+        self.generation = 0    # Bumped by flush(): writes from before it are dropped
+        self.resampled = 0     # Generation the resampler state belongs to (event loop only)
+        self.running = False
+        self.thread = None
+        self.loop = None
+        self.cond = threading.Condition()
+        self._space = asyncio.Event()
+
+        # 📊 Metrics
+        self.underruns = 0
+        self.max_depth = 0
+        self.writes = 0
+        self.bytes_played = 0
+        self.bytes_queued = 0  # Copied into the ring by write()
+        self._reply_underruns = 0
+
+    def _align(self, n):
+        return int(n) // self.frame * self.frame
+
+    def _bytes(self, ms):
+        return self._align(ms / 1000 * self.bytes_per_second)
+
+    # ▶️ Start the writer thread (call from inside the event loop)
+    def start(self):
+        if self.running:
+            return
+        if self.devices.output_stream is None:
+            self.devices.start()
+        rate = self.devices.output_device_rate
+        resampler = Resampler(self.devices.output_rate, rate)
+        self.resampler = None if resampler.passthrough else resampler
+        self.bytes_per_second = rate * self.frame
+        self.capacity = self._bytes(self.capacity_s * 1000)
+        self.ring = bytearray(self.capacity)
+        self.view = memoryview(self.ring)
+        self.write_bytes = self._bytes(self.write_ms)
+        self.prebuffer = self._bytes(self.prebuffer_ms)
+        self.min_prebuffer = self._bytes(self.min_prebuffer_ms)
+        self.max_prebuffer = self._bytes(self.max_prebuffer_ms)
+        self.loop = asyncio.get_running_loop()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="billy-playback", daemon=True)
+        self.thread.start()
+        print(f"🔊 Playback ring ready ({self.capacity // 1024} KiB).")
+
+    def _ready(self):
+        return self.size > 0 and (self.playing or self.draining or self.size >= self.prebuffer)
+
+    # 🧵 Writer thread: ring -> PortAudio, one short write at a time
+    def _run(self):
+        stream = self.devices.output_stream
+        while True:
+            with self.cond:
+                while self.running and not self._ready():
+                    self.cond.wait()
+                if not self.running:
+                    return
+                if self.dry_at and self.playing and time.monotonic() > self.dry_at:
+                    # The device went dry while we waited: count it and prebuffer again
+                    self.underruns += 1
+                    self._reply_underruns += 1
+                    self.prebuffer = min(self.max_prebuffer, self._align(self.prebuffer * 1.5))
+                    self.playing = False
+                self.dry_at = 0.0
+                if not self._ready():
+                    continue
+                self.playing = True
+                n = min(self.size, self.write_bytes, self.capacity - self.head)
+                # PyAudio's write() only takes bytes, so this is the one copy out of the ring
+                block = bytes(self.view[self.head:self.head + n])
+                self.head = (self.head + n) % self.capacity
+                self.size -= n
+                self.inflight = n
+            stream.write(block)
+            with self.cond:
+                self.inflight = 0
+                self.writes += 1
+                self.bytes_played += n
+                if self.size == 0:
+                    self.drained_at = time.monotonic()
+                    if self.draining:
+                        self.playing = False
+                        self.draining = False
+                    elif self.playing:
+                        self.dry_at = time.monotonic() + self.devices.output_latency
+            self._wake()
+
+    def _wake(self):
+        try:
+            self.loop.call_soon_threadsafe(self._space.set)
+        except RuntimeError:
+            pass  # Loop already closed (shutdown)
+
+    # 📥 Copy PCM (bytes, memoryview, mmap slice) into the ring; waits only when the ring is full
+    async def write(self, data):
+        if not self.running:
+            self.start()
+        generation = self.generation
+        if self.resampler is not None:
+            if self.resampled != generation:
+                self.resampler.reset()  # Flushed since the last write: no filter tail from the old audio
+                self.resampled = generation
+            data = self.resampler.process(data)
+        src = memoryview(data).cast("B")
+        while len(src):
+            with self.cond:
+                if self.generation != generation:
+                    return  # Flushed (barge-in) while we waited for room
+                free = self.capacity - self.size - self.inflight
+                if free > 0:
+                    n = min(free, len(src))
+                    tail = (self.head + self.size) % self.capacity
+                    first = min(n, self.capacity - tail)
+                    self.view[tail:tail + first] = src[:first]
+                    self.view[:n - first] = src[first:n]
+                    self.size += n
+                    self.bytes_queued += n
+                    self.max_depth = max(self.max_depth, self.size)
+                    self.cond.notify()
+                    src = src[n:]
+                    continue
+                self._space.clear()
+            await self._space.wait()
+
+    # 🏁 Reply done: play out the tail, decay the prebuffer if it went cleanly
+    def end(self):
+        with self.cond:
+            self.draining = True
+            if self._reply_underruns == 0:
+                self.prebuffer = max(self.min_prebuffer, self._align(self.prebuffer * 0.9))
+            self._reply_underruns = 0
+            self.cond.notify()
+
+    # ⏳ Wait until queued audio is at most `limit` bytes
+    async def wait_depth(self, limit=0):
+        while self.depth() > limit:
+            self._space.clear()
+            await self._space.wait()
+
+    # ⏳ Paced producers (filler) keep only `ms` queued beyond the prebuffer
+    async def wait_ahead(self, ms):
+        await self.wait_depth(self.prebuffer + self._bytes(ms))
+
+    # ⏳ Until at most `ms` of audio is left to play (the next listen arms here)
+    async def wait_left(self, ms):
+        await self.wait_depth(self._bytes(ms))
+
+    # 🤐 Drop everything queued (the write in flight still finishes); safe from any thread
+    # The resampler is reset by the next write(), on the event loop where it runs
+    def flush(self):
+        with self.cond:
+            self.generation += 1
+            self.size = 0
+            self.playing = False
+            self.draining = False
+            self.dry_at = 0.0
+        if self.loop is not None:
+            self._wake()  # A write waiting for room sees the flush and gives up
+
+    def depth(self):
+        with self.cond:
+            return self.size + self.inflight
+
+    # ⏱ Playback clock: when the next queued sample will come out of the speaker
+    def play_time(self):
+        return time.monotonic() + self.devices.output_latency + self.depth() / self.bytes_per_second
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        if self.thread is not None:
+            self.thread.join(timeout=1)
+            self.thread = None
+
+    def stats(self):
+        return {
+            "underruns": self.underruns,
+            "depth_ms": round(1000 * self.depth() / self.bytes_per_second, 1),
+            "max_depth_ms": round(1000 * self.max_depth / self.bytes_per_second, 1),
+            "prebuffer_ms": round(1000 * self.prebuffer / self.bytes_per_second, 1),
+            "writes": self.writes,
+            "queued_kib": self.bytes_queued // 1024,
+            "played_kib": self.bytes_played // 1024,
+        }
+
+# 🐟 Shared engine used by billy.tts and billy.filler
+playback = PerFish("playback", PlaybackEngine)
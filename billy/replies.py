@@ -0,0 +1,247 @@
+# Response cache for the questions everybody asks ("what's your name", "tell me a joke")
+# Transcripts are normalized and fuzzy-matched (difflib) against an index on disk
+# Each question holds a small pool of reply variants (text + pre-rendered pcm_22050),
+# served in rotation; learned variants expire after a TTL, seeded ones don't
+# A hit skips GPT and TTS and starts playback at once; frequent misses learn a new variant
+# from the live reply. Seed replies are rendered once (needs network):
+#   python -m billy.replies
+
+import os
+import re
+import json
+import time
+import random
+import difflib
+import asyncio
+import collections
+from billy.config import (
+    reply_cache, reply_cache_dir, reply_cache_max_mb, reply_cache_ttl_h, reply_variants
+)
+from billy.phrase_cache import PhraseCache, normalize
+from billy.gpt import memory
+from billy.tts import speak
+from billy.tracing import tracer
+from billy.perfish import Shared
+
+# Words that don't change the question when they open or close it ("hey billy, ..., please")
+FILLER_WORDS = {"um", "uh", "hey", "hi", "oh", "ok", "okay", "so", "well", "please", "billy", "sammy", "fish"}
+CONTRACTIONS = {"what's": "what is", "who's": "who is", "where's": "where is", "you're": "you are",
+                "can't": "cannot", "won't": "will not", "i'm": "i am", "let's": "let us"}
+
+SEED_REPLIES = {
+    "what is your name": [
+        "Yah! I am Billy, da bass with da biggest muscles in da whole lake!",
+        "Da name is Billy. Remember it, because I'll be back!",
+    ],
+    "say i will be back": [
+        "I'll be back! Aaargh!",
+        "Hasta la vista, baby... and then, I'll be back!",
+    ],
+    "tell me a joke": [
+        "Why did da fish go to da gym? To get mussels! Hah!",
+        "What do you call a fish wearing a bowtie? Sofishticated! Yah!",
+    ],
+}
+
+# 🧽 "Hey Billy, what's your NAME?" -> "what is your name"
+def normalize_prompt(text):
+    words = re.sub(r"[^\w\s']", " ", normalize(text)).split()
+    words = " ".join(CONTRACTIONS.get(w, w) for w in words).split()
+    while words and words[0] in FILLER_WORDS:
+        words.pop(0)
+    while words and words[-1] in FILLER_WORDS:
+        words.pop()
+    return " ".join(words)
+
+Hit = collections.namedtuple("Hit", "text pcm")
+
+class ResponseCache:
+    def __init__(self, directory=reply_cache_dir, max_bytes=reply_cache_max_mb * 1024 * 1024,
+                 ttl_s=reply_cache_ttl_h * 3600, variants=reply_variants, min_count=2,
+                 similarity=0.9, refresh=0.25, max_questions=500, enabled=reply_cache):
+        self.enabled = enabled
+        self.ttl_s = ttl_s
+        self.variants = variants      # Pool size per question
+        self.min_count = min_count    # Asked this often before we start keeping replies
+        self.similarity = similarity  # difflib ratio that counts as the same question
+        self.refresh = refresh        # Chance a hit on an unfilled pool asks GPT for a new variant
+        self.max_questions = max_questions
+        self.index_path = os.path.join(directory, "index.json")
+        self.audio = PhraseCache(os.path.join(directory, "pcm"), max_bytes, max_text_chars=2000)
+        self.entries = {}  # normalized question -> {"count", "next", "variants": [{"text", "created", "seed"}]}
+        self.dirty = False    # Counters changed since the index was last written
+        self._saving = None   # Background index write in flight
+
+        # 📊 Metrics
+        self.hits = 0
+        self.misses = 0
+        self.learned = 0
+
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def _save(self):
+        self.dirty = False
+        self._write(json.dumps(self.entries))
+
+    def _write(self, data):
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(data)
+        os.replace(tmp, self.index_path)
+
+    # 💾 Lookup counters reach disk after the reply has played, off the event loop
+    def save_later(self):
+        if not self.dirty or (self._saving is not None and not self._saving.done()):
+            return
+        self.dirty = False
+        data = json.dumps(self.entries)  # Snapshot on the loop: lookups keep mutating entries
+        self._saving = asyncio.get_running_loop().run_in_executor(None, self._write, data)
+
+    # 💾 Whatever is still pending (shutdown)
+    def save(self):
+        if self.dirty:
+            self._save()
+
+    # 🔎 Closest known question (exact first, then fuzzy)
+    def _match(self, key):
+        if key in self.entries:
+            return key
+        close = difflib.get_close_matches(key, self.entries.keys(), n=1, cutoff=self.similarity)
+        return close[0] if close else None
+
+    # 🧹 Room for a new question: forget the rarest one that has no replies stored
+    def _prune(self):
+        if len(self.entries) < self.max_questions:
+            return
+        spare = [k for k, e in self.entries.items() if not e["variants"]]
+        if spare:
+            del self.entries[min(spare, key=lambda k: self.entries[k]["count"])]
+
+    def _live(self, entry):
+        now = time.time()
+        entry["variants"] = [v for v in entry["variants"] if v.get("seed") or now - v["created"] < self.ttl_s]
+        return entry["variants"]
+
+    # 🗃 A stored reply for this transcript, or None (GPT + TTS as usual)
+    def lookup(self, prompt):
+        if not self.enabled:
+            return None
+        key = normalize_prompt(prompt)
+        if not key:
+            return None
+        match = self._match(key)
+        if match is None:
+            match = key
+            self._prune()
+        entry = self.entries.setdefault(match, {"count": 0, "next": 0, "variants": []})
+        entry["count"] += 1
+        variants = self._live(entry)
+        # Pool not full yet: now and then let GPT write a fresh one so it doesn't sound canned
+        if not variants or (len(variants) < self.variants and random.random() < self.refresh):
+            self.misses += 1
+            self.dirty = True
+            return None
+        while variants:
+            variant = variants[entry["next"] % len(variants)]
+            entry["next"] += 1
+            pcm = self.audio.get(variant["text"])
+            if pcm is not None:
+                self.hits += 1
+                self.dirty = True
+                print(f"💬 Cached reply for {match!r}")
+                return Hit(variant["text"], pcm)
+            variants.remove(variant)  # Audio evicted
+        self.misses += 1
+        self.dirty = True
+        return None
+
+    # 🎓 Keep a live reply to this question? (returns the index key, or None)
+    def wants(self, prompt):
+        if not self.enabled:
+            return None
+        key = normalize_prompt(prompt)
+        match = self._match(key) if key else None
+        entry = self.entries.get(match)
+        if entry is None or entry["count"] < self.min_count or len(self._live(entry)) >= self.variants:
+            return None
+        return match
+
+    def learn(self, key, text, pcm, seed=False):
+        text = text.strip()
+        entry = self.entries.setdefault(key, {"count": 0, "next": 0, "variants": []})
+        if not text or not pcm or any(v["text"] == text for v in entry["variants"]):
+            return
+        self.audio.put(text, pcm)
+        entry["variants"].append({"text": text, "created": time.time(), "seed": seed})
+        del entry["variants"][:-self.variants]
+        self.learned += 1
+        self.dirty = True
+        print(f"🎓 Learned reply {len(entry['variants'])}/{self.variants} for {key!r}")
+
+    # 🗣 Play a hit: no GPT, no TTS (returns speak()'s barge-in result)
+    async def play(self, prompt, hit, on_queued=None):
+        tracer.note("reply_cache_hit", 1)
+        memory.add(prompt, hit.text)
+        try:
+            return await speak(pcm=hit.pcm, on_queued=on_queued)
+        finally:
+            self.save_later()
+
+    # 🗣 Speak a live reply; a frequent question keeps it as a new variant if it finished
+    async def speak(self, prompt, text_iterator, on_queued=None):
+        key = self.wants(prompt)
+        if key is None:
+            try:
+                return await speak(text_iterator, on_queued)
+            finally:
+                self.save_later()
+        text, pcm, voiced = [], [], set()
+        interrupted = await speak(_collect(text_iterator, text), on_queued, pcm_sink=pcm, voiced=voiced)
+        if interrupted is None and voiced and all(backend.caches for backend in voiced):
+            self.learn(key, "".join(text), b"".join(pcm))  # Only the ElevenLabs voice is kept
+        self.save_later()
+        return interrupted
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "questions": len(self.entries),
+            "variants": sum(len(e["variants"]) for e in self.entries.values()),
+            "learned": self.learned,
+        }
+
+async def _collect(text_iterator, parts):
+    async for text in text_iterator:
+        parts.append(text)
+        yield text
+
+# 🎙 Render SEED_REPLIES into the cache (needs network)
+async def render_seeds():
+    from billy.tts_pool import tts_pool
+    from billy.tts import audio_listener
+
+    for question, texts in SEED_REPLIES.items():
+        for text in texts:
+            ws = await tts_pool.acquire()
+            await ws.send(json.dumps({"text": text + " ", "try_trigger_generation": True}))
+            await ws.send(json.dumps({"text": ""}))
+            pcm = b"".join([chunk async for chunk in audio_listener(ws, [text])])
+            replies.learn(question, text, pcm, seed=True)
+    replies.save()
+    await tts_pool.close()
+
+# 🐟 Shared cache (index loaded on first use)
+replies = Shared("replies", ResponseCache)
+
+if __name__ == "__main__":
+    asyncio.run(render_seeds())
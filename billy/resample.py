@@ -0,0 +1,61 @@
+# Block resampling for int16 mono PCM
+# Polyphase windowed-sinc FIR in NumPy, filter state carried between blocks
+# Used where the sound card's native rate differs from the pipeline rate (16 kHz mic, 22.05 kHz TTS)
+
+from math import gcd
+import numpy as np
+
+class Resampler:
+    def __init__(self, src_rate, dst_rate, taps=16, beta=8.0):
+        self.src_rate = int(src_rate)
+        self.dst_rate = int(dst_rate)
+        g = gcd(self.src_rate, self.dst_rate)
+        self.up = self.dst_rate // g
+        self.down = self.src_rate // g
+        self.taps = int(np.ceil(taps * max(1.0, self.down / self.up)))  # Longer filter when decimating
+        self.bank = self._design(self.taps, beta)
+        self.reset()
+
+        # 📊 Metrics
+        self.samples_in = 0
+        self.samples_out = 0
+
+    @property
+    def passthrough(self):
+        return self.up == self.down
+
+    # 🎛 Prototype low-pass (90% of the lower Nyquist) split into `up` phases of `taps` each
+    def _design(self, taps, beta):
+        n = self.up * taps
+        cutoff = 0.45 / max(self.up, self.down)  # Cycles per sample at the upsampled rate
+        m = np.arange(n) - (n - 1) / 2
+        h = 2 * cutoff * np.sinc(2 * cutoff * m) * np.kaiser(n, beta) * self.up
+        # bank[p, k] multiplies x[base - k] for output phase p
+        return h.reshape(taps, self.up).T.astype(np.float32).copy()
+
+    def reset(self):
+        self.history = np.zeros(self.taps - 1, dtype=np.float32)
+        self.pos = 0       # Next output position, in 1/up input samples from the block start
+        self.odd_byte = b""
+
+    # 🔁 Convert one block; output length follows the running rate ratio exactly
+    def process(self, pcm):
+        if self.passthrough:
+            return bytes(pcm)
+        if self.odd_byte or len(pcm) % 2:
+            pcm = self.odd_byte + bytes(pcm)
+            self.odd_byte = pcm[len(pcm) - len(pcm) % 2:]
+            pcm = pcm[:len(pcm) - len(pcm) % 2]
+        x = np.frombuffer(pcm, dtype=np.int16).astype(np.float32)
+        span = len(x) * self.up
+        count = max(0, -(-(span - self.pos) // self.down))
+        buf = np.concatenate((self.history, x))
+        positions = self.pos + self.down * np.arange(count)
+        base = positions // self.up + self.taps - 1
+        windows = buf[base[:, None] - np.arange(self.taps)]
+        y = np.einsum("nk,nk->n", windows, self.bank[positions % self.up])
+        self.pos += self.down * count - span
+        self.history = buf[len(buf) - (self.taps - 1):]
+        self.samples_in += len(x)
+        self.samples_out += count
+        return np.clip(np.rint(y), -32768, 32767).astype(np.int16).tobytes()
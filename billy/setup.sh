@@ -27,6 +27,10 @@ source env/bin/activate
 echo "📦 Installing Python packages..."
 pip install -r requirements.txt
 
+# === Optional Python Packages ===
+echo "📦 Installing optional packages (offline speech recognition + voice, FLAC uploads)..."
+pip install vosk piper-tts soundfile
+
 # === Setup Complete ===
 echo "✅ Setup complete!"
 echo "🧪 Now create a .env file with your API keys, then run:"
@@ -0,0 +1,151 @@
+# Per-turn end-to-end latency tracing
+# Monotonic timestamps for each point on the hot path, one JSONL line per turn
+# Prometheus-style text file with rolling p50/p95 per span
+# Plain per-turn numbers (prompt tokens, time to first token) ride along as values
+
+import os
+import json
+import time
+import collections
+from billy.config import trace_dir
+from billy.perfish import PerFish
+
+MARKS = (
+    "button_press", "speech_onset", "end_of_speech", "transcript_ready",
+    "first_gpt_token", "first_cached_chunk", "first_tts_chunk_sent", "first_audio_chunk",
+    "first_sample_played", "last_sample_played", "reply_drained", "barge_in",
+    "previous_reply_end", "listening",
+)
+
+# (span name, from mark, to mark)
+SPANS = (
+    ("press_to_onset", "button_press", "speech_onset"),
+    ("utterance", "speech_onset", "end_of_speech"),
+    ("transcription", "end_of_speech", "transcript_ready"),
+    ("gpt_first_token", "transcript_ready", "first_gpt_token"),
+    ("token_to_cache_hit", "first_gpt_token", "first_cached_chunk"),
+    ("token_to_tts_send", "first_gpt_token", "first_tts_chunk_sent"),
+    ("tts_first_audio", "first_tts_chunk_sent", "first_audio_chunk"),
+    ("audio_to_speaker", "first_audio_chunk", "first_sample_played"),
+    ("response_latency", "end_of_speech", "first_sample_played"),
+    ("playback", "first_sample_played", "last_sample_played"),
+    ("played_before_barge_in", "first_sample_played", "barge_in"),
+    ("reply_to_listen", "previous_reply_end", "listening"),
+)
+
+class Tracer:
+    def __init__(self, directory, window=200):
+        self.directory = directory
+        self.jsonl_path = os.path.join(directory, "turns.jsonl")
+        self.prom_path = os.path.join(directory, "billy.prom")
+        self.spans = collections.defaultdict(lambda: collections.deque(maxlen=window))
+        self.turns = 0
+        self.completed = 0
+        self.current = None
+        self.reply_end = None  # When the last finished turn's reply left the ring (or was cut off)
+        self.values = {}  # Latest value of each note, for the metrics file
+
+    # 🎬 New turn (marks from the previous one are dropped if it never ended)
+    def begin(self):
+        self.turns += 1
+        self.current = {"turn": self.turns, "wall_time": time.time(), "marks": {}, "values": {}}
+
+    # 📍 First call wins, so hot paths can mark unconditionally
+    def mark(self, name, at=None):
+        if self.current is not None and name not in self.current["marks"]:
+            self.current["marks"][name] = time.monotonic() if at is None else at
+
+    # 🔢 A number that belongs to this turn (last call wins)
+    def note(self, name, value):
+        if self.current is not None:
+            self.current["values"][name] = value
+
+    # ⏮ Follow-on turn in the same conversation: measure the gap from the last reply
+    def follow_on(self):
+        if self.reply_end is not None:
+            self.mark("previous_reply_end", at=self.reply_end)
+
+    def discard(self):
+        self.current = None
+        self.reply_end = None
+
+    # 🏁 Close the turn: compute spans, append JSONL, refresh the metrics file
+    def end(self):
+        turn, self.current = self.current, None
+        if turn is None:
+            return None
+        self.completed += 1
+        marks = turn["marks"]
+        # Not last_sample_played: that estimate includes the output latency, "listening" doesn't
+        self.reply_end = marks.get("barge_in", marks.get("reply_drained"))
+        origin = min(marks.values()) if marks else 0.0
+        spans = {}
+        # Reply opened from the phrase cache: its first audio didn't come from the TTS send
+        opened_cached = marks.get("first_cached_chunk", float("inf")) < marks.get("first_tts_chunk_sent", float("inf"))
+        for name, start, stop in SPANS:
+            if name == "tts_first_audio" and opened_cached:
+                continue
+            if start in marks and stop in marks:
+                spans[name] = marks[stop] - marks[start]
+                self.spans[name].append(spans[name])
+
+        record = {
+            "turn": turn["turn"],
+            "wall_time": turn["wall_time"],
+            "marks_ms": {m: round((marks[m] - origin) * 1000, 2) for m in MARKS if m in marks},
+            "spans_ms": {k: round(v * 1000, 2) for k, v in spans.items()},
+            "values": turn["values"],
+        }
+        self.values.update(turn["values"])
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.jsonl_path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        self._write_prometheus()
+        if "response_latency" in spans:
+            print(f"⏱ Turn {turn['turn']}: {spans['response_latency'] * 1000:.0f} ms from end of speech to first sample")
+        return record
+
+    def summary(self):
+        out = {}
+        for name, values in self.spans.items():
+            ordered = sorted(values)
+            out[name] = {
+                "count": len(ordered),
+                "p50": _quantile(ordered, 0.5),
+                "p95": _quantile(ordered, 0.95),
+            }
+        return out
+
+    def _write_prometheus(self):
+        lines = [
+            "# HELP billy_turns_total Conversation turns traced.",
+            "# TYPE billy_turns_total counter",
+            f"billy_turns_total {self.completed}",
+            "# HELP billy_turn_span_seconds Rolling per-turn latency spans.",
+            "# TYPE billy_turn_span_seconds summary",
+        ]
+        for name, values in sorted(self.spans.items()):
+            ordered = sorted(values)
+            for q in (0.5, 0.95):
+                lines.append(f'billy_turn_span_seconds{{span="{name}",quantile="{q}"}} {_quantile(ordered, q):.6f}')
+            lines.append(f'billy_turn_span_seconds_sum{{span="{name}"}} {sum(ordered):.6f}')
+            lines.append(f'billy_turn_span_seconds_count{{span="{name}"}} {len(ordered)}')
+        if self.values:
+            lines += [
+                "# HELP billy_turn_value Per-turn values from the last turn that reported them.",
+                "# TYPE billy_turn_value gauge",
+            ]
+            for name, value in sorted(self.values.items()):
+                lines.append(f'billy_turn_value{{name="{name}"}} {value}')
+        tmp = self.prom_path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp, self.prom_path)  # Scrapers never see a half-written file
+
+def _quantile(ordered, q):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+# 🐟 Shared tracer
+tracer = PerFish("tracer", lambda: Tracer(trace_dir))
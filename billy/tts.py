@@ -1,165 +1,371 @@
-# ElevenLabs WebSocket connection
-# Real-time TTS playback
-# Random mouth/tail animation while audio plays
+# ElevenLabs WebSocket connection (warm sockets from billy.tts_pool), or the local Piper engine
+# (billy.piper_tts) when ElevenLabs is unreachable or slower than the latency budget
+# Real-time TTS playback (cached phrases served locally)
+# Mouth synced to the audio envelope, random tail animation while audio plays
+# All motor moves go through the billy.actuator thread
+# speak(): the reply can be cut short by barge-in (billy.audio)
+# Whole replies pre-rendered by billy.replies play straight from memory (no socket)
 
 import json
 import base64
 import asyncio
 import websockets
-import pyaudio
 import random
-import numpy as np
 import time
+import collections
 from contextlib import suppress
-from billy.config import (
-    ELEVENLABS_API_KEY, VOICE_ID,
-    format, channels, sample_rate, chunk_duration_ms, vad
-)
-from billy.hardware import GPIO, MOUTH_PIN, TAIL_PIN, TAIL_PIN_2, h
-from billy.gpt import text_chunker
-
-# 🐟 Flap mouth & tail until cancelled
+from billy.config import tts_backend, tts_latency_budget_ms, piper_voice_path, playback_rate
+from billy.actuator import actuator
+from billy.playback import playback
+from billy.tts_pool import tts_pool
+from billy.piper_tts import piper_engine
+from billy.phrase_cache import phrase_cache
+from billy.filler import filler
+from billy.lipsync import lipsync
+from billy.tracing import tracer
+from billy.gpt import text_chunker, chunk_policy
+from billy.audio import barge_in
+from billy.config import barge_in as barge_in_enabled
+
+# 🐟 Swing head & tail until cancelled (moves are queued ahead on the actuator thread)
 async def continuous_billy_animation():
     # Always start with head movement (TAIL_PIN active)
-    GPIO.gpio_write(h, TAIL_PIN, 1)
-    GPIO.gpio_write(h, TAIL_PIN_2, 0)
-    next_swap = asyncio.get_event_loop().time() + random.uniform(3, 6)
+    actuator.tail(head=True)
+    next_swap = time.monotonic() + random.uniform(3, 6)
     tail_state = True  # True = TAIL_PIN, False = TAIL_PIN_2
 
     try:
         while True:
-            await asyncio.sleep(0.05)  # Just yield control
-
-            now = asyncio.get_event_loop().time()
-            if now >= next_swap:
-                if tail_state:
-                    # Turn off head (TAIL_PIN)
-                    GPIO.gpio_write(h, TAIL_PIN, 0)
-                    await asyncio.sleep(random.uniform(1, 2))  # Pause before tail
-                    GPIO.gpio_write(h, TAIL_PIN_2, 1)
-                else:
-                    # Turn off tail (TAIL_PIN_2)
-                    GPIO.gpio_write(h, TAIL_PIN_2, 0)
-                    await asyncio.sleep(random.uniform(0.5, 1))  # Pause before head
-                    GPIO.gpio_write(h, TAIL_PIN, 1)
-                tail_state = not tail_state
-                next_swap = now + random.uniform(3, 5)
+            # Wake a little early and queue the whole swap with exact timestamps
+            await asyncio.sleep(max(0, next_swap - time.monotonic() - 0.2))
+            if tail_state:
+                # Head off, pause, then tail
+                actuator.tail(at=next_swap)
+                actuator.tail(tail=True, at=next_swap + random.uniform(1, 2))
+            else:
+                # Tail off, pause, then head
+                actuator.tail(at=next_swap)
+                actuator.tail(head=True, at=next_swap + random.uniform(0.5, 1))
+            tail_state = not tail_state
+            next_swap += random.uniform(3, 5)
 
     except asyncio.CancelledError:
-        GPIO.gpio_write(h, MOUTH_PIN, 0)
-        GPIO.gpio_write(h, TAIL_PIN, 0)
-        GPIO.gpio_write(h, TAIL_PIN_2, 0)
+        actuator.clear("tail")
+        actuator.tail()  # Mouth is closed by lip-sync when the last sample plays
         print("🛑 Animation cancelled.")
 
-# 🦷 Jittery, random mouth flap task
-async def random_mouth_flap():
+# 🔊 Play audio with lip-sync
+async def play_audio(audio_stream, on_queued=None, pcm_sink=None):
+    """
+    Plays audio chunks with the mouth following the speech envelope.
+    `on_queued` is called once the whole reply is queued for the speaker (its end is still playing).
+    `pcm_sink` (a list) collects a copy of every chunk played.
+    """
+    try:
+        first = True
+        async for chunk in audio_stream:
+            if first:
+                first = False
+                await filler.handoff()  # 🤝 Cut the filler clip, real speech takes over
+                tracer.mark("first_sample_played", at=playback.play_time())
+            lipsync.feed(chunk, playback.play_time())
+            if pcm_sink is not None:
+                pcm_sink.append(bytes(chunk))
+            await playback.write(chunk)  # 📥 Into the ring, the writer thread feeds the speaker
+        playback.end()
+        if on_queued:
+            on_queued()
+        end = playback.play_time()
+        lipsync.finish(end)
+        tracer.mark("last_sample_played", at=end)
+        await playback.wait_depth(0)  # Don't start listening while Billy is still talking
+        tracer.mark("reply_drained", at=playback.drained_at)  # Same clock as the next "listening"
+    except BaseException:
+        playback.flush()
+        lipsync.reset()
+        raise
+    finally:
+        filler.cancel()
+        print("🔇 Audio playback finished.")
+
+# 📥 Audio chunks for one socket session
+# With sync_alignment every audio message says when each character starts (ms into that message),
+# so the session's PCM is cut back into the chunks it was sent as and each is cached under its own text
+async def audio_listener(ws, segment):
+    pcm = []
+    starts = []  # Byte offset where each non-space character starts
+    offset = 0
     try:
         while True:
-            # Randomize open duration (short, normal, or long)
-            open_time = random.choices(
-                [random.uniform(0.03, 0.08), random.uniform(0.09, 0.18), random.uniform(0.18, 0.35)],
-                weights=[0.3, 0.6, 0.1]
-            )[0]
-            # Occasionally jitter mid-flap
-            if random.random() < 0.2:
-                open_time += random.uniform(-0.02, 0.02)
-                open_time = max(0.02, open_time)
-
-            GPIO.gpio_write(h, MOUTH_PIN, 1)
-            print(f"OPEN {time.time()} for {open_time:.3f}s")
-            await asyncio.sleep(open_time)
-
-            # Sometimes do a double-flap (quick close/open)
-            if random.random() < 0.15:
-                GPIO.gpio_write(h, MOUTH_PIN, 0)
-                await asyncio.sleep(random.uniform(0.02, 0.06))
-                GPIO.gpio_write(h, MOUTH_PIN, 1)
-                print(f"DOUBLE-OPEN {time.time()}")
-                await asyncio.sleep(random.uniform(0.03, 0.09))
-
-            GPIO.gpio_write(h, MOUTH_PIN, 0)
-
-            # Randomize closed duration (short or normal)
-            close_time = random.choices(
-                [random.uniform(0.04, 0.12), random.uniform(0.13, 0.28)],
-                weights=[0.4, 0.6]
-            )[0]
-            # Occasionally jitter mid-close
-            if random.random() < 0.15:
-                close_time += random.uniform(-0.02, 0.02)
-                close_time = max(0.02, close_time)
-
-            print(f"CLOSE {time.time()} for {close_time:.3f}s")
-            await asyncio.sleep(close_time)
-    except asyncio.CancelledError:
-        GPIO.gpio_write(h, MOUTH_PIN, 0)
+            msg = await ws.recv()
+            data = json.loads(msg)
+            audio_b64 = data.get("audio")
+            if audio_b64:
+                chunk = base64.b64decode(audio_b64)
+                tracer.mark("first_audio_chunk")
+                alignment = data.get("alignment") or {}
+                for char, ms in zip(alignment.get("chars", ()), alignment.get("charStartTimesMs", ())):
+                    if not char.isspace():
+                        starts.append(offset + int(ms * playback_rate / 1000) * 2)
+                pcm.append(chunk)
+                offset += len(chunk)
+                yield chunk
+            elif data.get("isFinal"):
+                break
+        cache_segment(segment, b"".join(pcm), starts)
+    finally:
+        await ws.close()
+
+# ✂️ One phrase cache entry per chunk sent (skipped if the alignment doesn't cover the text)
+def cache_segment(segment, pcm, starts):
+    counts = [sum(not c.isspace() for c in text) for text in segment]
+    if sum(counts) != len(starts):
+        return
+    cut, seen = 0, 0
+    for text, count in zip(segment, counts):
+        if not count:
+            continue
+        seen += count
+        end = starts[seen] if seen < len(starts) else len(pcm)
+        phrase_cache.put(text, pcm[cut:end])
+        cut = end
+
+# 🗃 Serve cached PCM in playback-sized slices
+async def cached_audio(pcm, slice_bytes=4410):
+    tracer.mark("first_audio_chunk")
+    view = memoryview(pcm)
+    for i in range(0, len(view), slice_bytes):
+        yield view[i:i + slice_bytes]
+
+# 🔌 One ElevenLabs stream-input socket
+class ElevenLabsSession:
+    def __init__(self, ws):
+        self.ws = ws
+        self.segment = []  # Chunks sent so far (one phrase cache key each)
+
+    async def send(self, text):
+        message = {"text": text, "try_trigger_generation": True}
+        if chunk_policy.flush_first and not self.segment:
+            message["flush"] = True  # Don't wait for chunk_length_schedule on the opening words
+        self.segment.append(text)
+        await self.ws.send(json.dumps(message))
+
+    async def finish(self):
+        await self.ws.send(json.dumps({"text": ""}))
+
+    def audio(self):
+        return audio_listener(self.ws, self.segment)
+
+    async def close(self):
+        await self.ws.close()
+
+class ElevenLabsBackend:
+    name = "elevenlabs"
+    caches = True  # Phrase cache and billy.replies store this voice
+
+    async def open(self):
+        return ElevenLabsSession(await tts_pool.acquire())  # 🔥 Already connected + initialized
+
+# 🧭 Which engine voices the next reply
+class TTSPolicy:
+    """
+    "auto": ElevenLabs unless it can't be reached (a failed connect in billy.tts_pool) or its
+    recent time to first audio is over budget, then the local engine. While over budget,
+    ElevenLabs still gets one reply every `probe_s` so we notice when it recovers.
+    """
+    def __init__(self, mode=tts_backend, budget_ms=tts_latency_budget_ms, local=piper_engine,
+                 window=5, probe_s=60, offline_s=30):
+        self.mode = mode
+        self.budget_ms = budget_ms
+        self.remote = ElevenLabsBackend()
+        self.local = local if local is not None and local.available() else None
+        self.probe_s = probe_s
+        self.offline_s = offline_s  # A connect failure this recent counts as offline
+        self.first_audio_ms = collections.defaultdict(lambda: collections.deque(maxlen=window))
+        self.remote_tried = 0.0
+
+        # 📊 Metrics
+        self.replies = collections.Counter()
+        self.fallbacks = 0
+
+        if mode in ("auto", "piper") and self.local is None:
+            print(f"⚠️ No local TTS voice at {piper_voice_path}: ElevenLabs only")
+
+    # 🖥 Voice loads while we wait for the button
+    def start(self):
+        if self.local is not None and self.mode != "elevenlabs":
+            self.local.start()
 
-# 🔊 Play audio while animating
-async def play_audio(audio_stream):
+    def stop(self):
+        if self.local is not None:
+            self.local.stop()
+
+    def p50(self, name):
+        values = sorted(self.first_audio_ms[name])
+        return round(values[len(values) // 2]) if values else None
+
+    def choose(self):
+        if self.local is None or self.mode == "elevenlabs":
+            return self.remote
+        if self.mode == "piper":
+            return self.local
+        now = time.monotonic()
+        if tts_pool.failed_at is not None and now - tts_pool.failed_at < self.offline_s:
+            return self.local  # 📴 The pool's prewarm keeps probing the connection
+        slow = self.p50(self.remote.name)
+        if slow is not None and slow > self.budget_ms and now - self.remote_tried < self.probe_s:
+            return self.local
+        self.remote_tried = now
+        return self.remote
+
+    # 🛟 Couldn't open `backend` mid-reply: who takes over (None = nobody)
+    def fallback(self, backend):
+        if self.local is None or backend is self.local:
+            return None
+        self.fallbacks += 1
+        return self.local
+
+    def record(self, backend, ms):
+        self.first_audio_ms[backend.name].append(ms)
+        tracer.note("tts_first_audio_ms", round(ms))
+
+    def stats(self):
+        return {
+            "replies": dict(self.replies),
+            "fallbacks": self.fallbacks,
+            "first_audio_p50_ms": {name: self.p50(name) for name in self.first_audio_ms},
+        }
+
+# 🎙 Real-time speech through whichever backend the policy picks
+async def tts_stream(text_iterator, on_queued=None, pcm_sink=None, voiced=None):
     """
-    Plays audio chunks while randomizing mouth animation.
+    `voiced` (a set) collects every backend that voiced part of the reply (cached phrases
+    count as ElevenLabs).
     """
-    audio = pyaudio.PyAudio()
-    stream = audio.open(format=pyaudio.paInt16, channels=1, rate=22050, output=True)
+    voiced = set() if voiced is None else voiced
+    sources = asyncio.Queue()  # Cached clips and backend sessions, in speaking order
+    sessions = []
+    backend = tts_policy.choose()
 
-    # Start random mouth flapping in the background
-    mouth_task = asyncio.create_task(random_mouth_flap())
-    loop = asyncio.get_running_loop()
+    async def open_session():
+        nonlocal backend
+        try:
+            return await backend.open()
+        except (OSError, websockets.WebSocketException) as e:
+            local = tts_policy.fallback(backend)
+            if local is None:
+                raise
+            print(f"⚠️ {backend.name} unavailable ({e}), {local.name} takes over")
+            backend = local
+            return await backend.open()
+
+    # ⏱ Time to first audio of the reply's opening session (connect included)
+    async def timed(session, started):
+        first = True
+        async for chunk in session.audio():
+            if first:
+                first = False
+                tts_policy.record(backend, (time.monotonic() - started) * 1000)
+            yield chunk
+
+    # 📨 Text to the backend (cache hits skip it entirely)
+    async def stream_text():
+        session = None
+        opened = False
+        async for text in text_chunker(text_iterator):
+            pcm = phrase_cache.get(text) if backend.caches else None  # One voice per reply
+            if pcm is not None:
+                tracer.mark("first_cached_chunk")
+                voiced.add(tts_policy.remote)
+                if session is not None:
+                    await session.finish()  # Finish the running session first
+                    session = None
+                await sources.put(cached_audio(pcm))
+                opened = True
+                continue
+            if session is None:
+                started = time.monotonic()
+                session = await open_session()
+                voiced.add(backend)
+                sessions.append(session)
+                await sources.put(session.audio() if opened else timed(session, started))
+                opened = True
+            await session.send(text)
+            tracer.mark("first_tts_chunk_sent")
+        if session is not None:
+            await session.finish()
+        await sources.put(None)
 
+    async def ordered_audio():
+        while True:
+            source = await sources.get()
+            if source is None:
+                break
+            async for chunk in source:
+                yield chunk
+
+    # Start animation in background
+    animation_task = asyncio.create_task(continuous_billy_animation())
+    text_task = asyncio.create_task(stream_text())
     try:
-        async for chunk in audio_stream:
-            await loop.run_in_executor(None, stream.write, chunk)
+        await asyncio.gather(play_audio(ordered_audio(), on_queued, pcm_sink), text_task)
     finally:
-        mouth_task.cancel()
+        text_task.cancel()
         with suppress(asyncio.CancelledError):
-            await mouth_task
-        GPIO.gpio_write(h, MOUTH_PIN, 0)
-        stream.stop_stream()
-        stream.close()
-        audio.terminate()
-        print("🔇 Audio stream closed.")
-
-# 🎙 ElevenLabs Real-Time Speech
-async def elevenlabs_stream(text_iterator):
-    uri = (
-        f"wss://api.elevenlabs.io/v1/text-to-speech/{VOICE_ID}/stream-input"
-        f"?model_id=eleven_turbo_v2&output_format=pcm_22050"
-    )
-
-    async with websockets.connect(uri) as ws:
-        await ws.send(json.dumps({
-            "text": " ",
-            "voice_settings": {"stability": 0.5, "similarity_boost": 0.5},
-            "generation_config": {"chunk_length_schedule": [50]},
-            "xi_api_key": ELEVENLABS_API_KEY,
-            "model_id": "eleven_turbo_v2"
-        }))
-
-        # 📥 Audio chunks from ElevenLabs
-        async def audio_listener():
-            while True:
-                msg = await ws.recv()
-                data = json.loads(msg)
-                audio_b64 = data.get("audio")
-                if audio_b64:
-                    yield base64.b64decode(audio_b64)
-                elif data.get("isFinal"):
-                    break
-
-        # 📨 Text to ElevenLabs
-        async def stream_text():
-            async for text in text_chunker(text_iterator):
-                await ws.send(json.dumps({"text": text, "try_trigger_generation": True}))
-            await ws.send(json.dumps({"text": ""}))
-
-        # Start animation in background
-        animation_task = asyncio.create_task(continuous_billy_animation())
-        try:
-            await asyncio.gather(
-                play_audio(audio_listener()),
-                stream_text()
-            )
-        finally:
-            animation_task.cancel()
-            with suppress(asyncio.CancelledError):
-                await animation_task
+            await text_task
+        animation_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await animation_task
+        for session in sessions:
+            await session.close()  # Sessions whose audio was never consumed
+        tts_policy.replies[backend.name] += 1
+        stats = phrase_cache.stats()
+        print(f"🗃 Phrase cache: {stats['hits']} hits / {stats['misses']} misses ({backend.name} voice)")
+
+# 🗃 A whole reply already rendered (billy.replies): no GPT, no socket
+async def play_cached(pcm, on_queued=None):
+    animation_task = asyncio.create_task(continuous_billy_animation())
+    try:
+        await play_audio(cached_audio(pcm), on_queued)
+    finally:
+        animation_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await animation_task
+
+# ⚡ Say the reply unless the user talks over it
+async def speak(text_iterator=None, on_queued=None, pcm_sink=None, pcm=None, voiced=None):
+    """
+    Streams the reply to the speaker (or plays `pcm`, a pre-rendered reply). Returns the
+    interrupting speech (billy.vad frames, onset included) if the user barged in, else None.
+    The frames stay with barge_in until the next listen takes them.
+    `voiced` (a set) is filled with the backends that spoke a streamed reply.
+    """
+    if pcm is not None:
+        say = play_cached(pcm, on_queued)
+    else:
+        say = tts_stream(text_iterator, on_queued, pcm_sink, voiced)
+    if not barge_in_enabled:
+        await say
+        return None
+    reply = asyncio.create_task(say)
+    barge_in.watch()
+    interrupted = asyncio.create_task(barge_in.wait())
+    try:
+        await asyncio.wait({reply, interrupted}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        barge_in.unwatch()
+        interrupted.cancel()
+    if not barge_in.event.is_set():
+        await reply  # Finished normally (or surface its error)
+        return None
+    # Closes the TTS sockets and the GPT stream on the way out
+    reply.cancel()
+    with suppress(asyncio.CancelledError):
+        await reply
+    filler.cancel()
+    tracer.mark("barge_in", at=barge_in.triggered_at)
+    print("⚡ Barge-in: Billy stops talking and listens.")
+    return barge_in.onset
+
+# 🐟 Shared policy
+tts_policy = TTSPolicy()
@@ -0,0 +1,135 @@
+# Pre-connected ElevenLabs stream-input sockets
+# The next reply's socket is opened + initialized in the background (e.g. while transcribing)
+# Keepalive and reconnect so every reply starts on a warm socket
+
+import json
+import time
+import asyncio
+import collections
+from contextlib import suppress
+import websockets
+from billy.config import ELEVENLABS_API_KEY, VOICE_ID, ELEVENLABS_WS_BASE
+
+MODEL_ID = "eleven_turbo_v2"
+OUTPUT_FORMAT = "pcm_22050"
+VOICE_SETTINGS = {"stability": 0.5, "similarity_boost": 0.5}
+
+def _alive(ws):
+    state = getattr(ws, "state", None)
+    return state is not None and state.name == "OPEN"
+
+class TTSSessionPool:
+    def __init__(self, size=1, keepalive_s=15, max_age_s=120):
+        self.size = size
+        self.keepalive_s = keepalive_s  # ElevenLabs drops idle sockets after 20 s
+        self.max_age_s = max_age_s
+        self.ready = collections.deque()  # (ws, opened_at)
+        self._filling = None
+        self._keepalive_task = None
+        self.failed_at = None  # Last time a connect failed (cleared by the next success)
+
+        # 📊 Metrics
+        self.warm_hits = 0
+        self.cold_opens = 0
+        self.reconnects = 0
+
+    @property
+    def uri(self):
+        return (
+            f"{ELEVENLABS_WS_BASE}/v1/text-to-speech/{VOICE_ID}/stream-input"
+            f"?model_id={MODEL_ID}&output_format={OUTPUT_FORMAT}&sync_alignment=true"
+        )
+
+    # 🤝 Connect + send the voice/settings handshake
+    async def _open(self):
+        ws = await websockets.connect(self.uri)
+        await ws.send(json.dumps({
+            "text": " ",
+            "voice_settings": VOICE_SETTINGS,
+            "generation_config": {"chunk_length_schedule": [50]},
+            "xi_api_key": ELEVENLABS_API_KEY,
+            "model_id": MODEL_ID
+        }))
+        return ws
+
+    # ▶️ Start keepalive and warm the first socket (call from inside the event loop)
+    def start(self):
+        if self._keepalive_task is None:
+            self._keepalive_task = asyncio.create_task(self._keepalive())
+        self.prewarm()
+
+    # 🔥 Open the next socket in the background if the pool is short
+    def prewarm(self):
+        if len(self.ready) < self.size and (self._filling is None or self._filling.done()):
+            self._filling = asyncio.create_task(self._fill())
+
+    async def _fill(self):
+        while len(self.ready) < self.size:
+            try:
+                ws = await self._open()
+            except (OSError, websockets.WebSocketException) as e:
+                print(f"⚠️ TTS prewarm failed: {e}")
+                self.failed_at = time.monotonic()
+                return
+            self.failed_at = None
+            self.ready.append((ws, time.monotonic()))
+
+    # 🎟 Hand out a warm socket (or open one now if none is ready)
+    async def acquire(self):
+        if not self.ready and self._filling is not None and not self._filling.done():
+            with suppress(Exception):
+                await self._filling
+        while self.ready:
+            ws, opened_at = self.ready.popleft()
+            if _alive(ws) and time.monotonic() - opened_at < self.max_age_s:
+                self.warm_hits += 1
+                self.prewarm()
+                return ws
+            self.reconnects += 1
+            asyncio.create_task(ws.close())
+        self.cold_opens += 1
+        try:
+            ws = await self._open()
+        except (OSError, websockets.WebSocketException):
+            self.failed_at = time.monotonic()
+            raise
+        self.failed_at = None
+        self.prewarm()
+        return ws
+
+    # 💓 Keep idle sockets open, replace dead or stale ones
+    async def _keepalive(self):
+        while True:
+            await asyncio.sleep(self.keepalive_s)
+            now = time.monotonic()
+            for entry in list(self.ready):
+                ws, opened_at = entry
+                try:
+                    if not _alive(ws) or now - opened_at >= self.max_age_s:
+                        raise ConnectionError("stale")
+                    await ws.send(json.dumps({"text": " "}))
+                except (ConnectionError, websockets.WebSocketException):
+                    with suppress(ValueError):
+                        self.ready.remove(entry)
+                    self.reconnects += 1
+                    asyncio.create_task(ws.close())
+            self.prewarm()
+
+    async def close(self):
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._keepalive_task
+            self._keepalive_task = None
+        if self._filling is not None:
+            self._filling.cancel()
+        while self.ready:
+            ws, _ = self.ready.popleft()
+            with suppress(Exception):
+                await ws.close()
+
+    def stats(self):
+        return {"warm": self.warm_hits, "cold": self.cold_opens, "reconnects": self.reconnects}
+
+# 🐟 Shared pool
+tts_pool = TTSSessionPool()
@@ -0,0 +1,80 @@
+# Speech probability per 30 ms frame, computed once in the capture callback
+# NumPy RMS for a whole block of frames + a running noise floor (no audioop)
+# Combined with webrtcvad; capture, endpointing and barge-in all read the same stream
+
+import collections
+import numpy as np
+from billy.config import (
+    sample_rate, chunk_duration_ms, vad as webrtc_vad,
+    noise_floor_init, speech_snr_db, speech_threshold
+)
+from billy.perfish import PerFish
+
+# 🎞 One captured frame plus everything we know about it
+Frame = collections.namedtuple("Frame", "pcm rms noise prob speech")
+
+class SpeechDetector:
+    def __init__(self, rate=sample_rate, frame_ms=chunk_duration_ms, vad=webrtc_vad,
+                 noise_floor=noise_floor_init, snr_db=speech_snr_db, threshold=speech_threshold,
+                 slope_db=3.0, min_floor=50.0, window_ms=3000, fall=0.3, rise=0.05, vad_weight=0.6):
+        self.rate = rate
+        self.samples = int(rate * frame_ms / 1000)
+        self.frame_bytes = self.samples * 2
+        self.vad = vad
+        self.noise_floor = float(noise_floor)
+        self.snr_db = snr_db          # SNR that counts as a coin flip
+        self.slope_db = slope_db      # How quickly probability climbs around it
+        self.threshold = threshold
+        self.min_floor = min_floor    # Digital silence shouldn't make every click "speech"
+        self.recent = collections.deque(maxlen=int(window_ms / frame_ms))  # Quietest frame here = noise
+        self.fall = fall              # Floor drops quickly when the room goes quiet...
+        self.rise = rise              # ...and follows steady noise up more slowly
+        self.vad_weight = vad_weight  # How much a webrtcvad "no" pulls the probability down
+
+        # 📊 Metrics
+        self.frames = 0
+        self.speech_frames = 0
+
+    # 📈 Features for every whole frame in `pcm` (one NumPy pass per block)
+    def process(self, pcm):
+        count = len(pcm) // self.frame_bytes
+        if count == 0:
+            return []
+        x = np.frombuffer(pcm, dtype=np.int16, count=count * self.samples).reshape(count, self.samples)
+        rms = np.sqrt(np.mean(np.square(x, dtype=np.float32), axis=1))
+        voiced = np.array([
+            self.vad.is_speech(pcm[i * self.frame_bytes:(i + 1) * self.frame_bytes], self.rate)
+            for i in range(count)
+        ], dtype=np.float32)
+
+        # Floor follows the quietest recent frame (speech always has gaps, crowd noise doesn't)
+        floors = np.empty(count, dtype=np.float32)
+        floor = self.noise_floor
+        for i in range(count):
+            floors[i] = floor
+            self.recent.append(max(float(rms[i]), self.min_floor))
+            target = min(self.recent)
+            floor += (self.fall if target < floor else self.rise) * (target - floor)
+        self.noise_floor = floor
+
+        snr = 20 * np.log10(np.maximum(rms, 1.0) / np.maximum(floors, self.min_floor))
+        energy = 1 / (1 + np.exp(-(snr - self.snr_db) / self.slope_db))
+        prob = energy * (1 - self.vad_weight + self.vad_weight * voiced)
+        speech = prob >= self.threshold
+
+        self.frames += count
+        self.speech_frames += int(speech.sum())
+        return [
+            Frame(pcm[i * self.frame_bytes:(i + 1) * self.frame_bytes],
+                  float(rms[i]), float(floors[i]), float(prob[i]), bool(speech[i]))
+            for i in range(count)
+        ]
+
+    def stats(self):
+        return {
+            "noise_floor": round(self.noise_floor, 1),
+            "speech_ratio": round(self.speech_frames / self.frames, 3) if self.frames else 0.0,
+        }
+
+# 🐟 Shared detector (fed by billy.capture)
+detector = PerFish("detector", SpeechDetector)
@@ -0,0 +1,206 @@
+#  Fleet mode: several fish from one host, one process, one event loop
+# Each fish gets its own GPIO pins, sound card, capture/playback engines, motors, tracer and
+# conversation memory (BILLY_FLEET file, see fleet.example.json); OpenAI/ElevenLabs clients,
+# warm TTS sockets, the phrase/reply caches and the local ASR/TTS engines are shared
+# Local inference runs in BILLY_LOCAL_WORKERS Piper processes / Vosk decoder threads;
+# VAD and resampling stay on each fish's own PortAudio callback thread
+# Per-fish and fleet-wide throughput: <trace_dir>/fleet.prom, per-fish traces in <trace_dir>/<name>
+#   python fleet.py [fleet.json]
+
+import os
+import sys
+import json
+import time
+import asyncio
+import webrtcvad
+import main as billy_main
+from billy.config import fleet_config, gpio_chip, trace_dir, vad_mode
+from billy.perfish import current
+from billy.hardware import Hardware, Button
+from billy.devices import AudioDevices
+from billy.vad import SpeechDetector
+from billy.capture import CaptureEngine
+from billy.playback import PlaybackEngine
+from billy.actuator import Actuator
+from billy.lipsync import LipSync
+from billy.filler import FillerPlayer
+from billy.audio import BargeIn
+from billy.tracing import Tracer, _quantile
+from billy.memory import ConversationMemory
+from billy.gpt import SYSTEM_PROMPT
+from billy.tts_pool import tts_pool
+from billy.tts import tts_policy
+from billy.replies import replies
+
+# 🐟 One animatronic: its own parts, resolved by billy.perfish inside its task
+class Fish:
+    def __init__(self, name, chip=gpio_chip, pins=None, input_device=None, output_device=None, restart_s=5.0):
+        self.name = name
+        self.restart_s = restart_s
+        hardware = Hardware(chip, **(pins or {}))  # pins: button, mouth, tail, tail_2
+        devices = AudioDevices(input_device=input_device, output_device=output_device)
+        detector = SpeechDetector(vad=webrtcvad.Vad(vad_mode))  # webrtcvad keeps per-stream state
+        capture = CaptureEngine(devices, detector)
+        playback = PlaybackEngine(devices)
+        actuator = Actuator(hardware)
+        lipsync = LipSync(actuator=actuator)
+        self.parts = {
+            "hardware": hardware,
+            "button": Button(hardware),
+            "devices": devices,
+            "detector": detector,
+            "capture": capture,
+            "playback": playback,
+            "actuator": actuator,
+            "lipsync": lipsync,
+            "filler": FillerPlayer(playback=playback, actuator=actuator, lipsync=lipsync),
+            "barge_in": BargeIn(capture, playback, actuator),
+            "tracer": Tracer(os.path.join(trace_dir, name)),
+            "memory": ConversationMemory(SYSTEM_PROMPT),
+        }
+        self.started = None
+
+        # 📊 Metrics
+        self.turns = 0
+        self.crashes = 0
+
+    # 🎯 From here on, this task's billy.* singletons are this fish's parts
+    def activate(self):
+        current.set(self)
+
+    def on_turn(self, record):
+        self.turns += 1
+
+    # 🔁 Button -> conversations until cancelled; a crash restarts the loop, not the hardware
+    async def run(self):
+        self.activate()
+        billy_main.start_fish()
+        self.started = time.monotonic()
+        try:
+            while True:
+                try:
+                    await billy_main.serve(on_turn=self.on_turn)
+                except Exception as e:
+                    self.crashes += 1
+                    self.parts["tracer"].discard()
+                    print(f"💥 {self.name}: {type(e).__name__}: {e} (restarting in {self.restart_s:.0f} s)")
+                    await asyncio.sleep(self.restart_s)
+        finally:
+            billy_main.stop_fish()
+
+    def stats(self):
+        elapsed = time.monotonic() - self.started if self.started else 0.0
+        latency = self.parts["tracer"].summary().get("response_latency", {})
+        capture = self.parts["capture"].stats()
+        return {
+            "turns": self.turns,
+            "turns_per_min": 60 * self.turns / elapsed if elapsed else 0.0,
+            "response_latency_p50_ms": round(latency.get("p50", 0.0) * 1000, 1),
+            "response_latency_p95_ms": round(latency.get("p95", 0.0) * 1000, 1),
+            "capture_dropped": capture["dropped"],
+            "capture_overflowed": capture["overflowed"],
+            "playback_underruns": self.parts["playback"].underruns,
+            "barge_ins": self.parts["barge_in"].count,
+            "crashes": self.crashes,
+        }
+
+# 🐠 Supervisor: shared services once, every fish as its own task
+class Fleet:
+    def __init__(self, fish, report_s=60):
+        self.fish = list(fish)
+        self.report_s = report_s
+        self.metrics_path = os.path.join(trace_dir, "fleet.prom")
+        self.started = None
+        self.cpu0 = 0.0
+
+    def start(self):
+        tts_pool.size = max(tts_pool.size, len(self.fish))  # 🔥 A warm socket for every fish that may reply
+        billy_main.start_shared()
+        self.started = time.monotonic()
+        self.cpu0 = time.process_time()
+
+    async def run(self):
+        self.start()
+        tasks = [asyncio.create_task(fish.run(), name=f"fish-{fish.name}") for fish in self.fish]
+        reporter = asyncio.create_task(self._report())
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            reporter.cancel()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.write_metrics()
+            tts_policy.stop()
+            replies.save()
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(self.report_s)
+            stats = self.stats()
+            self.write_metrics(stats)
+            print(f"🐠 Fleet: {stats['turns']} turns, {stats['turns_per_min']:.1f} turns/min, "
+                  f"CPU {stats['cpu_pct']:.0f}%, response p50 {stats['response_latency_p50_ms']:.0f} ms")
+
+    def stats(self):
+        elapsed = time.monotonic() - self.started if self.started else 0.0
+        fish = {f.name: f.stats() for f in self.fish}
+        latencies = sorted(v for f in self.fish for v in f.parts["tracer"].spans.get("response_latency", ()))
+        turns = sum(s["turns"] for s in fish.values())
+        return {
+            "fish": fish,
+            "turns": turns,
+            "turns_per_min": 60 * turns / elapsed if elapsed else 0.0,
+            "cpu_pct": 100 * (time.process_time() - self.cpu0) / elapsed if elapsed else 0.0,
+            "response_latency_p50_ms": round(_quantile(latencies, 0.5) * 1000, 1),
+            "response_latency_p95_ms": round(_quantile(latencies, 0.95) * 1000, 1),
+            "tts_pool": tts_pool.stats(),
+            "tts": tts_policy.stats(),
+            "replies": replies.stats(),
+        }
+
+    # 📈 Prometheus text file: one series per fish plus fleet totals (for sizing the host)
+    def write_metrics(self, stats=None):
+        stats = stats or self.stats()
+        lines = [
+            "# HELP billy_fleet_turns_total Turns per fish.",
+            "# TYPE billy_fleet_turns_total counter",
+        ]
+        for name, s in stats["fish"].items():
+            lines.append(f'billy_fleet_turns_total{{fish="{name}"}} {s["turns"]}')
+        for key, kind in (("turns_per_min", "gauge"), ("response_latency_p50_ms", "gauge"),
+                          ("response_latency_p95_ms", "gauge"), ("capture_dropped", "counter"),
+                          ("playback_underruns", "counter"), ("crashes", "counter")):
+            lines.append(f"# TYPE billy_fleet_{key} {kind}")
+            for name, s in stats["fish"].items():
+                lines.append(f'billy_fleet_{key}{{fish="{name}"}} {s[key]}')
+        lines += [
+            "# HELP billy_fleet_total Fleet-wide throughput and load.",
+            "# TYPE billy_fleet_total gauge",
+            f'billy_fleet_total{{metric="fish"}} {len(stats["fish"])}',
+            f'billy_fleet_total{{metric="turns_per_min"}} {stats["turns_per_min"]:.3f}',
+            f'billy_fleet_total{{metric="cpu_pct"}} {stats["cpu_pct"]:.1f}',
+            f'billy_fleet_total{{metric="response_latency_p50_ms"}} {stats["response_latency_p50_ms"]}',
+            f'billy_fleet_total{{metric="response_latency_p95_ms"}} {stats["response_latency_p95_ms"]}',
+        ]
+        os.makedirs(trace_dir, exist_ok=True)
+        tmp = self.metrics_path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp, self.metrics_path)
+
+# 📄 {"fish": [{"name": ..., "chip": 0, "pins": {...}, "input_device": ..., "output_device": ...}]}
+def load_fleet(path=fleet_config):
+    with open(path) as f:
+        spec = json.load(f)
+    names = [entry["name"] for entry in spec["fish"]]
+    if len(set(names)) != len(names):
+        raise SystemExit(f"{path}: fish names must be unique")
+    return Fleet([Fish(**entry) for entry in spec["fish"]], report_s=spec.get("report_s", 60))
+
+if __name__ == "__main__":
+    fleet = load_fleet(sys.argv[1] if len(sys.argv) > 1 else fleet_config)
+    try:
+        asyncio.run(fleet.run())
+    except KeyboardInterrupt:
+        print("🛑 Shutting down...")
@@ -1,28 +1,96 @@
 #  Main entry point, importing your helpers and running Billy’s loop
-from billy.audio import record_and_transcribe
-from billy.gpt import ask_billy
-from billy.tts import elevenlabs_stream
-from billy.hardware import wait_for_button
+from billy.audio import record_and_transcribe, barge_in
+from billy.gpt import ask_billy, memory
+from billy.replies import replies
+from billy.hardware import hardware, button, button_pressed
+from billy.devices import devices
+from billy.capture import capture
+from billy.playback import playback
+from billy.tts_pool import tts_pool
+from billy.tts import tts_policy
+from billy.filler import filler
+from billy.actuator import actuator
+from billy.tracing import tracer
+from billy.pipeline import Conversation
+from billy import asr
 import asyncio
 
-async def main():
+# 🗣 One conversational turn: listen, think, speak (stages back to back; see billy.pipeline)
+async def converse_once(pressed_at=None, buffer=None):
+    tracer.begin()
+    if pressed_at is not None:
+        tracer.mark("button_press", at=pressed_at)
+    else:
+        tracer.follow_on()
+    tts_pool.prewarm()  # Next reply's socket connects while we listen/transcribe
+    prompt = await asyncio.wait_for(
+        record_and_transcribe(
+            on_end_of_speech=filler.start,  # 🤔 "Yah..." while we think
+            preroll=barge_in.take(),  # ⚡ Interrupted last reply? Those words are already heard
+            buffer=buffer,
+        ),
+        timeout=20
+    )
+    print(f"🧠 GPT prompt: {prompt}")
+    hit = replies.lookup(prompt)
+    if hit is not None:
+        await replies.play(prompt, hit)  # 💬 Stored reply: straight to the speaker
+    else:
+        text_gen = await ask_billy(prompt)
+        await replies.speak(prompt, text_gen)  # Returns early if the user talks over Billy
+    return tracer.end()
+
+# 🐟 This fish's motors and audio (fleet.py runs this once per fish)
+def start_fish():
+    actuator.start()  # ⚡ Motor commands run on their own real-time thread
+    devices.start()  # 🎚 Open mic & speaker once, reuse every turn
+    playback.start()  # 🔊 Ring buffer + writer thread in front of the speaker
+    capture.start()  # 🎙 Callback capture keeps the loop free while listening
+
+# 🔌 Network and local engines, shared by every fish in the process
+def start_shared():
+    tts_pool.start()  # 🔥 Keep a pre-connected ElevenLabs socket ready
+    asr.recognizer.warm()  # 🖥 Local speech model loaded once, stays resident
+    tts_policy.start()  # 🗣 Local TTS voice loads in its worker process, ready for offline replies
+
+# 🔌 Bring up motors, audio and network once
+def startup():
+    start_fish()
+    start_shared()
+
+def stop_fish():
+    button.stop()
+    capture.stop()
+    playback.stop()
+    devices.close()
+    actuator.stop()
+    hardware.close()
+
+def shutdown():
+    tts_policy.stop()
+    replies.save()
+    stop_fish()
+
+# 🔁 Button press -> conversation, until cancelled
+async def serve(on_turn=None):
     while True:
-        wait_for_button()  # Wait for the button press to start
+        await button_pressed()  # Pool keepalive, prewarm etc. keep running while we wait
+        memory.reset()  # 🧠 New press, new conversation
+        # 🔁 Turns overlap: the next listen is armed while Billy's reply is still playing
+        conversation = Conversation(on_turn=on_turn or (lambda record: actuator.print_stats()))
         try:
-            while True:
-                try:
-                    # Set a timeout for listening
-                    print("🎤 Listening with VAD...")
-                    prompt = await asyncio.wait_for(record_and_transcribe(), timeout=20)
-                    print(f"🧠 GPT prompt: {prompt}")
-                    text_gen = await ask_billy(prompt)
-                    await elevenlabs_stream(text_gen)
-                except asyncio.TimeoutError:
-                    print("⏳ No input detected for 20 seconds. Returning to button press.")
-                    break  # Exit the inner loop and return to waiting for button press
-        except KeyboardInterrupt:
-            print("🛑 Shutting down...")
-            break
+            await conversation.run(button.pressed_at)
+        except asyncio.TimeoutError:
+            tracer.discard()
+            filler.cancel()
+            print("⏳ No input detected for 20 seconds. Returning to button press.")
+
+async def main():
+    startup()
+    try:
+        await serve()
+    except KeyboardInterrupt:
+        print("🛑 Shutting down...")
 
 if __name__ == "__main__":
     try:
@@ -30,5 +98,4 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         print("🛑 Shutting down...")
     finally:
-        from billy.hardware import h, GPIO
-        GPIO.gpiochip_close(h)
+        shutdown()